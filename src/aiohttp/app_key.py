@@ -0,0 +1,29 @@
+"""Typed application keys instead of string keys like app['my_private_key'].
+
+    JOB_QUEUE = AppKey("job_queue", JobQueue)
+    app[JOB_QUEUE] = jobs
+    jobs = request.app[JOB_QUEUE]  # a JobQueue for the type checker
+
+aiohttp >= 3.9 has web.AppKey; on older versions a key object with the
+same interface is used (app stores it as an ordinary hashable key).
+"""
+from typing import Generic, TypeVar
+
+from aiohttp import web
+
+T = TypeVar("T")
+
+if hasattr(web, "AppKey"):
+    AppKey = web.AppKey
+else:  # aiohttp < 3.9
+    class AppKey(Generic[T]):  # type: ignore[no-redef]
+        # хеш по id: ключ не совпадет со строковым ключом другой библиотеки
+        __slots__ = ("_name", "_t")
+
+        def __init__(self, name: str, t: type[T] | None = None):
+            self._name = name
+            self._t = t
+
+        def __repr__(self) -> str:
+            t = getattr(self._t, "__qualname__", self._t)
+            return f"<AppKey({self._name}, type={t})>"
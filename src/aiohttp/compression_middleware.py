@@ -0,0 +1,125 @@
+import asyncio
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Executor
+from typing import Callable
+
+from aiohttp import hdrs, web
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+
+def _gzip(body: bytes, level: int) -> bytes:
+    return zlib.compress(body, level, wbits=16 + zlib.MAX_WBITS)
+
+
+def _deflate(body: bytes, level: int) -> bytes:
+    return zlib.compress(body, level)
+
+
+def _brotli(body: bytes, level: int) -> bytes:
+    # у brotli своя шкала качества 0..11
+    return brotli.compress(body, quality=min(level, 11))
+
+
+COMPRESSORS: dict[str, Callable[[bytes, int], bytes]] = {
+    "gzip": _gzip,
+    "deflate": _deflate,
+}
+if brotli is not None:
+    COMPRESSORS = {"br": _brotli, **COMPRESSORS}
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    # порядок COMPRESSORS - предпочтение сервера при равном q
+    accepted: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if coding:
+            accepted[coding.strip()] = q
+    best, best_q = None, 0.0
+    for coding in COMPRESSORS:
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compression_middleware(*, min_size: int = 1024,
+                           offload_size: int = 64 * 1024, level: int = 6,
+                           executor: Executor | None = None,
+                           cache_size: int = 256):
+    """Compresses web.Response bodies (br if installed, gzip, deflate).
+
+    Bodies shorter than `min_size` are sent as is. Bodies of `offload_size`
+    bytes and more are compressed in `executor` (zlib and brotli release
+    the GIL), so the event loop is not blocked. Responses with an ETag
+    (and without Cache-Control no-store / private) keep their compressed
+    variants in an LRU of `cache_size` entries keyed by (path and query,
+    ETag, encoding).
+    """
+    cache: OrderedDict[tuple[str, str, str], bytes] = OrderedDict()
+
+    @web.middleware
+    async def middleware(request: web.Request, handler):
+        resp = await handler(request)
+        if (not isinstance(resp, web.Response)
+                or not isinstance(resp.body, (bytes, bytearray))
+                or len(resp.body) < min_size
+                or resp.status in (204, 304)
+                or hdrs.CONTENT_ENCODING in resp.headers):
+            return resp
+
+        vary = resp.headers.get(hdrs.VARY)
+        if vary is None:
+            resp.headers[hdrs.VARY] = hdrs.ACCEPT_ENCODING
+        elif "accept-encoding" not in vary.lower():
+            resp.headers[hdrs.VARY] = f"{vary}, {hdrs.ACCEPT_ENCODING}"
+        encoding = negotiate_encoding(
+            request.headers.get(hdrs.ACCEPT_ENCODING, ""))
+        if encoding is None:
+            return resp
+
+        etag = resp.headers.get(hdrs.ETAG)
+        cache_control = resp.headers.get(hdrs.CACHE_CONTROL, "").lower()
+        key = None
+        if etag and "no-store" not in cache_control \
+                and "private" not in cache_control:
+            # ETag уникален только в пределах одного ресурса
+            key = (request.path_qs, etag, encoding)
+        compressed = cache.get(key) if key else None
+        if compressed is not None:
+            cache.move_to_end(key)
+        else:
+            body = bytes(resp.body)
+            if len(body) >= offload_size:
+                loop = asyncio.get_running_loop()
+                compressed = await loop.run_in_executor(
+                    executor, COMPRESSORS[encoding], body, level)
+            else:
+                compressed = COMPRESSORS[encoding](body, level)
+            if key:
+                cache[key] = compressed
+                if len(cache) > cache_size:
+                    cache.popitem(last=False)
+
+        resp.body = compressed
+        resp.headers[hdrs.CONTENT_ENCODING] = encoding
+        resp.headers.pop(hdrs.CONTENT_LENGTH, None)
+        if etag and not etag.startswith("W/"):
+            # сжатое тело уже не совпадает байт в байт с исходным
+            resp.headers[hdrs.ETAG] = f"W/{etag}"
+        return resp
+
+    middleware.cache = cache
+    return middleware
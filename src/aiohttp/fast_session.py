@@ -0,0 +1,97 @@
+from http.cookies import BaseCookie, Morsel, SimpleCookie
+from typing import Any, Mapping
+
+import aiohttp
+from aiohttp import hdrs
+from aiohttp.abc import AbstractCookieJar
+from aiohttp.typedefs import LooseCookies
+from multidict import CIMultiDict
+from yarl import URL
+
+
+def encode_cookies(cookies: Mapping[str, str]) -> str:
+    # так же, как ClientRequest.update_cookies, но один раз
+    cookie: SimpleCookie = SimpleCookie()
+    for name, value in cookies.items():
+        cookie[name] = value
+    return cookie.output(header="", sep=";").strip()
+
+
+class SingleHostCookieJar(AbstractCookieJar):
+    """Cookie jar for a client that talks to one host.
+
+    Cookies set by responses from `host` are stored by name and sent back
+    to that host only. There is no domain / path matching and no expiry
+    check on every request, as the default CookieJar does; a cookie set
+    with Max-Age=0 (or an empty value) is removed.
+    """
+
+    def __init__(self, host: str, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.host = host
+        self._cookies: dict[str, Morsel] = {}
+
+    def __iter__(self):
+        return iter(self._cookies.values())
+
+    def __len__(self) -> int:
+        return len(self._cookies)
+
+    def clear(self, predicate=None) -> None:
+        if predicate is None:
+            self._cookies.clear()
+        else:
+            for name, morsel in list(self._cookies.items()):
+                if predicate(morsel):
+                    del self._cookies[name]
+
+    def clear_domain(self, domain: str) -> None:
+        if domain == self.host:
+            self._cookies.clear()
+
+    def update_cookies(self, cookies: LooseCookies,
+                       response_url: URL = URL()) -> None:
+        # куки из конструктора сессии приходят без response_url
+        if response_url.host is not None and response_url.host != self.host:
+            return
+        if isinstance(cookies, Mapping):
+            cookies = cookies.items()
+        for name, value in cookies:
+            if not isinstance(value, Morsel):
+                morsel: Morsel = Morsel()
+                morsel.set(name, str(value), str(value))
+                value = morsel
+            if value.value == "" or value["max-age"] in ("0", 0):
+                self._cookies.pop(name, None)
+            else:
+                self._cookies[name] = value
+
+    def filter_cookies(self, request_url: URL) -> BaseCookie:
+        # новый объект на каждый запрос: aiohttp дописывает в него куки
+        # из аргумента cookies= конкретного запроса
+        cookie: SimpleCookie = SimpleCookie()
+        if self._cookies and request_url.host == self.host:
+            for name, morsel in self._cookies.items():
+                dict.__setitem__(cookie, name, morsel)
+        return cookie
+
+
+def fast_session(*, headers: Mapping[str, str] | None = None,
+                 cookies: Mapping[str, str] | None = None,
+                 cookie_jar: AbstractCookieJar | None = None,
+                 **kwargs: Any) -> aiohttp.ClientSession:
+    """ClientSession for service-to-service calls.
+
+    Constant `cookies` are encoded once into a Cookie header and added to
+    the prebuilt default `headers`, so the session doesn't parse and
+    re-encode them for every request. Response cookies are ignored
+    (DummyCookieJar) unless another `cookie_jar` is passed, e.g.
+    SingleHostCookieJar.
+    """
+    default_headers: CIMultiDict[str] = CIMultiDict(headers or {})
+    if cookies:
+        default_headers[hdrs.COOKIE] = encode_cookies(cookies)
+    if cookie_jar is None:
+        cookie_jar = aiohttp.DummyCookieJar()
+    return aiohttp.ClientSession(headers=default_headers,
+                                 cookie_jar=cookie_jar, **kwargs)
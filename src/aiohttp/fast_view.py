@@ -0,0 +1,47 @@
+from aiohttp import hdrs, web
+
+
+class FastView:
+    """Lightweight base for class-based views registered with
+    fast_view_routes(): just `self.request`, no __dict__."""
+
+    __slots__ = ("request",)
+
+    def __init__(self, request: web.Request):
+        self.request = request
+
+
+def fast_view_routes(path: str, view_cls: type, *, name: str | None = None,
+                     **kwargs) -> list[web.RouteDef]:
+    """Route definitions for a class-based view without web.View dispatch.
+
+    The method -> handler map is resolved once, here: every method the view
+    defines becomes its own route, and a final catch-all route answers
+    405 with a precomputed Allow header. Per request only the view object
+    is created (FastView subclasses and plain web.View subclasses both work).
+
+        app.add_routes(fast_view_routes('/root', MyView, name="root_name"))
+    """
+    handlers = {method: getattr(view_cls, method.lower())
+                for method in sorted(hdrs.METH_ALL)
+                if callable(getattr(view_cls, method.lower(), None))}
+    if not handlers:
+        raise ValueError(f"{view_cls.__name__} has no HTTP method handlers")
+
+    routes = []
+    for method, func in handlers.items():
+        async def handler(request: web.Request, _func=func):
+            return await _func(view_cls(request))
+
+        routes.append(web.route(method, path, handler, name=name, **kwargs))
+
+    # ответ 405 собирается при регистрации, а не на каждый запрос
+    allow = ",".join(handlers)
+
+    async def method_not_allowed(request: web.Request):
+        return web.Response(status=405, text="405: Method Not Allowed",
+                            headers={hdrs.ALLOW: allow})
+
+    routes.append(web.route(hdrs.METH_ANY, path, method_not_allowed,
+                            name=name, **kwargs))
+    return routes
@@ -0,0 +1,392 @@
+import asyncio
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+CACHEABLE_STATUS = frozenset({200, 203, 300, 301, 308, 404, 410})
+# заголовки, которые обновляются из ответа 304 Not Modified
+REVALIDATION_HEADERS = ("Cache-Control", "Date", "Expires", "ETag",
+                        "Last-Modified", "Age", "Vary")
+# запрос с ними - ответ конкретного пользователя, общий кеш не для него
+CREDENTIAL_HEADERS = ("Authorization", "Cookie", "Proxy-Authorization")
+
+
+def parse_cache_control(value: str | None) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def freshness_lifetime(headers: CIMultiDict, now: float) -> float | None:
+    cache_control = parse_cache_control(headers.get("Cache-Control"))
+    try:
+        if "max-age" in cache_control:
+            lifetime = float(cache_control["max-age"])
+        elif "Expires" in headers:
+            date = headers.get("Date")
+            start = parsedate_to_datetime(date).timestamp() if date else now
+            lifetime = parsedate_to_datetime(headers["Expires"]).timestamp() \
+                - start
+        else:
+            return None
+        return lifetime - float(headers.get("Age", 0))
+    except (TypeError, ValueError):
+        # некорректный Expires означает "уже устарел"
+        return 0.0
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    status: int
+    headers: list[tuple[str, str]]
+    url: str
+    expires_at: float
+    vary: dict[str, str | None] = field(default_factory=dict)
+    body: bytes | mmap.mmap = b""
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    @property
+    def cache_control(self) -> dict[str, str | None]:
+        return parse_cache_control(CIMultiDict(self.headers)
+                                   .get("Cache-Control"))
+
+    def is_fresh(self, now: float) -> bool:
+        return "no-cache" not in self.cache_control and now < self.expires_at
+
+    def validators(self) -> dict[str, str]:
+        headers = CIMultiDict(self.headers)
+        conditional = {}
+        if "ETag" in headers:
+            conditional["If-None-Match"] = headers["ETag"]
+        if "Last-Modified" in headers:
+            conditional["If-Modified-Since"] = headers["Last-Modified"]
+        return conditional
+
+    def matches(self, request_headers: CIMultiDict) -> bool:
+        return all(request_headers.get(name) == value
+                   for name, value in self.vary.items())
+
+    def meta(self, key: str) -> dict:
+        return {"key": key, "status": self.status, "headers": self.headers,
+                "url": self.url, "expires_at": self.expires_at,
+                "vary": self.vary}
+
+    @classmethod
+    def from_meta(cls, meta: dict, body: bytes | mmap.mmap) -> "CacheEntry":
+        return cls(meta["status"], [tuple(h) for h in meta["headers"]],
+                   meta["url"], meta["expires_at"], meta["vary"], body)
+
+
+class MemoryStore:
+    """LRU for small entries, bounded by total body size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+
+    def get(self, key: str) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry):
+        self.pop(key)
+        self._entries[key] = entry
+        self.size += entry.size
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= evicted.size
+
+    def pop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+
+
+class DiskStore:
+    """Large entries: body and metadata files in `directory`, bodies are
+    returned memory-mapped. LRU by total body size. Methods are blocking
+    and meant to be called through an executor."""
+
+    def __init__(self, directory: str | os.PathLike, max_bytes: int):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._index: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+        self._rebuild()
+
+    def _rebuild(self):
+        # восстанавливаем индекс после перезапуска, старые - первыми
+        list_meta: list[tuple[float, Path]] = []
+        for meta_path in self.directory.glob("*.meta"):
+            try:
+                list_meta.append((meta_path.stat().st_mtime, meta_path))
+            except FileNotFoundError:
+                continue
+        list_meta.sort()
+        kept: set[str] = set()
+        for _, meta_path in list_meta:
+            body_path = meta_path.with_suffix(".body")
+            try:
+                key = json.loads(meta_path.read_text())["key"]
+                size = body_path.stat().st_size
+            except (OSError, ValueError, KeyError, TypeError):
+                # запись оборвалась посередине: метаданные без тела
+                # или испорченный JSON - такая запись не нужна
+                meta_path.unlink(missing_ok=True)
+                body_path.unlink(missing_ok=True)
+                continue
+            kept.add(meta_path.stem)
+            self._index[key] = size
+            self.size += size
+        # остатки прерванных _write и тела без метаданных не видны
+        # индексу и занимали бы место сверх max_bytes
+        for path in self.directory.glob("*.tmp"):
+            path.unlink(missing_ok=True)
+        for path in self.directory.glob("*.body"):
+            if path.stem not in kept:
+                path.unlink(missing_ok=True)
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return (self.directory / f"{name}.meta",
+                self.directory / f"{name}.body")
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        meta_path, body_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text())
+            with open(body_path, "rb") as f:
+                body = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+                    if os.fstat(f.fileno()).st_size else b""
+        except FileNotFoundError:
+            self.pop(key)
+            return None
+        return CacheEntry.from_meta(meta, body)
+
+    def put(self, key: str, entry: CacheEntry, with_body: bool = True):
+        meta_path, body_path = self._paths(key)
+        if with_body:
+            self._write(body_path, entry.body)
+        self._write(meta_path, json.dumps(entry.meta(key)).encode())
+
+        evicted = []
+        with self._lock:
+            self.size += entry.size - self._index.pop(key, 0)
+            self._index[key] = entry.size
+            while self.size > self.max_bytes and len(self._index) > 1:
+                old_key, old_size = self._index.popitem(last=False)
+                self.size -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._unlink(old_key)
+
+    def _write(self, path: Path, data: bytes):
+        # у каждой записи свой временный файл: параллельные put одного
+        # ключа не пишут в один и тот же .tmp
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with open(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def pop(self, key: str):
+        with self._lock:
+            self.size -= self._index.pop(key, 0)
+        self._unlink(key)
+
+    def _unlink(self, key: str):
+        for path in self._paths(key):
+            path.unlink(missing_ok=True)
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    status: int
+    headers: CIMultiDictProxy[str]
+    url: URL
+    body: bytes | mmap.mmap
+    # "hit", "revalidated", "miss" или "bypass"
+    cache_status: str
+
+    def read(self) -> bytes:
+        return bytes(self.body)
+
+    def json(self, loads=json.loads):
+        return loads(self.read())
+
+
+class CachingSession:
+    """Client-side HTTP cache for GET requests on top of ClientSession.
+
+    Honors Cache-Control (max-age, no-cache, no-store), Expires and Vary;
+    stale entries with ETag / Last-Modified are revalidated with a
+    conditional request and a 304 reuses the stored body. Entries up to
+    `memory_entry_max` bytes live in the in-memory LRU, bigger ones in the
+    memory-mapped DiskStore (if `cache_dir` is given).
+
+    The key is the normalized URL only, so requests with URL credentials,
+    CREDENTIAL_HEADERS or extra ClientSession.get() arguments (`auth`,
+    `cookies`, ...) bypass the cache, as SingleFlightSession does.
+    """
+
+    def __init__(self, session: aiohttp.ClientSession, *,
+                 cache_dir: str | os.PathLike | None = None,
+                 memory_max_bytes: int = 16 * 1024 * 1024,
+                 memory_entry_max: int = 256 * 1024,
+                 disk_max_bytes: int = 1024 * 1024 * 1024):
+        self.session = session
+        self.memory = MemoryStore(memory_max_bytes)
+        self.memory_entry_max = memory_entry_max
+        self.disk = DiskStore(cache_dir, disk_max_bytes) if cache_dir else None
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(url: URL) -> str:
+        return str(url.with_query(sorted(url.query.items())))
+
+    async def _lookup(self, key: str) -> CacheEntry | None:
+        entry = self.memory.get(key)
+        if entry is None and self.disk is not None:
+            loop = asyncio.get_running_loop()
+            entry = await loop.run_in_executor(None, self.disk.get, key)
+        return entry
+
+    async def _store(self, key: str, entry: CacheEntry,
+                     with_body: bool = True):
+        if entry.size <= self.memory_entry_max:
+            self.memory.put(key, entry)
+        elif self.disk is not None:
+            self.memory.pop(key)
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.disk.put, key, entry,
+                                       with_body)
+
+    async def get(self, url: str | URL, *, params=None, headers=None,
+                  **kwargs) -> CachedResponse:
+        url = URL(url)
+        if params:
+            url = url.update_query(params)
+        request_headers = CIMultiDict(headers or {})
+        request_cc = parse_cache_control(request_headers.get("Cache-Control"))
+        key = self.make_key(url)
+
+        if ("no-store" in request_cc or kwargs or url.user is not None
+                or any(name in request_headers
+                       for name in CREDENTIAL_HEADERS)):
+            status, resp_headers, resp_url, body = await self._fetch(
+                url, request_headers, kwargs)
+            return CachedResponse(status, resp_headers, resp_url, body,
+                                  "bypass")
+
+        entry = await self._lookup(key)
+        if entry is not None and not entry.matches(request_headers):
+            entry = None
+        now = time.time()
+        if (entry is not None and "no-cache" not in request_cc
+                and entry.is_fresh(now)):
+            self.hits += 1
+            return self._response(entry, "hit")
+
+        conditional = CIMultiDict(request_headers)
+        if entry is not None:
+            conditional.update(entry.validators())
+        status, resp_headers, resp_url, body = await self._fetch(
+            url, conditional, kwargs)
+
+        if status == 304 and entry is not None:
+            self.revalidations += 1
+            merged = CIMultiDict(entry.headers)
+            for name in REVALIDATION_HEADERS:
+                if name in resp_headers:
+                    merged[name] = resp_headers[name]
+            entry.headers = list(merged.items())
+            lifetime = freshness_lifetime(merged, now)
+            entry.expires_at = now + (lifetime or 0.0)
+            await self._store(key, entry, with_body=False)
+            return self._response(entry, "revalidated")
+
+        self.misses += 1
+        new_entry = self._make_entry(status, resp_headers, resp_url, body,
+                                     request_headers, now)
+        if new_entry is not None:
+            await self._store(key, new_entry)
+        elif entry is not None:
+            self.memory.pop(key)
+            if self.disk is not None:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.disk.pop, key)
+        return CachedResponse(status, resp_headers, resp_url, body, "miss")
+
+    async def _fetch(self, url: URL, headers: CIMultiDict, kwargs):
+        async with self.session.get(url, headers=headers, **kwargs) as resp:
+            return resp.status, resp.headers, resp.url, await resp.read()
+
+    @staticmethod
+    def _make_entry(status: int, headers: CIMultiDictProxy, url: URL,
+                    body: bytes, request_headers: CIMultiDict,
+                    now: float) -> CacheEntry | None:
+        if status not in CACHEABLE_STATUS:
+            return None
+        cache_control = parse_cache_control(headers.get("Cache-Control"))
+        if "no-store" in cache_control or headers.get("Vary") == "*":
+            return None
+        lifetime = freshness_lifetime(CIMultiDict(headers), now)
+        has_validator = "ETag" in headers or "Last-Modified" in headers
+        if lifetime is None and not has_validator:
+            return None
+        vary = {name.strip(): request_headers.get(name.strip())
+                for name in headers.get("Vary", "").split(",")
+                if name.strip()}
+        return CacheEntry(status, list(headers.items()), str(url),
+                          now + (lifetime or 0.0), vary, body)
+
+    @staticmethod
+    def _response(entry: CacheEntry, cache_status: str) -> CachedResponse:
+        return CachedResponse(entry.status,
+                              CIMultiDictProxy(CIMultiDict(entry.headers)),
+                              URL(entry.url), entry.body, cache_status)
+
+    def stats(self) -> dict:
+        total = self.hits + self.revalidations + self.misses
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "revalidation_rate": self.revalidations / total if total else 0.0,
+            "miss_rate": self.misses / total if total else 0.0,
+            "memory_bytes": self.memory.size,
+            "disk_bytes": self.disk.size if self.disk else 0,
+        }
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+from aiohttp import web
+from app_key import AppKey
+from metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class _Job:
+    __slots__ = ("fn", "args", "commit", "timeout", "enqueued", "future")
+
+    def __init__(self, fn, args, commit, timeout, enqueued, future):
+        self.fn = fn
+        self.args = args
+        self.commit = commit
+        self.timeout = timeout
+        self.enqueued = enqueued
+        self.future = future
+
+
+def _consume(future: asyncio.Future) -> None:
+    # fire-and-forget: ошибка уже залогирована и посчитана, без
+    # "Future exception was never retrieved"
+    if not future.cancelled():
+        future.exception()
+
+
+class JobQueue:
+    """Background jobs for an aiohttp app: `workers` tasks reading a
+    bounded queue of `maxsize` jobs.
+
+        jobs = setup_job_queue(app, workers=8)
+        ...
+        await request.app[JOB_QUEUE].submit(send_email, user_id)
+
+    submit() waits while the queue is full (backpressure), submit_nowait()
+    raises asyncio.QueueFull instead. Every job runs under a `job_timeout`.
+
+    On stop() (cleanup_ctx at shutdown) new jobs are refused and the queue
+    is drained for up to `drain_timeout` seconds; after that running jobs
+    are cancelled and queued ones dropped. Jobs submitted with commit=True,
+    or parts of a job wrapped in `await jobs.commit(coro)`, run under
+    asyncio.shield(): neither a timeout nor shutdown interrupts them, and
+    stop() waits for them to finish. A commit=True job that overruns its
+    timeout is counted in `timed_out` but keeps its worker until it ends,
+    and its future gets the real result.
+    """
+
+    def __init__(self, workers: int = 4, maxsize: int = 1000,
+                 job_timeout: float | None = 30.0,
+                 drain_timeout: float = 10.0):
+        self.workers = workers
+        self.job_timeout = job_timeout
+        self.drain_timeout = drain_timeout
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue(maxsize)
+        self._workers: list[asyncio.Task] = []
+        self._committing: set[asyncio.Task] = set()
+        self._closing = False
+        self._started = 0.0
+        self.completed = 0
+        self.failed = 0
+        self.timed_out = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.wait_time = Histogram()
+        self.latency = Histogram()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._started = time.monotonic()
+        self._workers = [loop.create_task(self._worker())
+                         for _ in range(self.workers)]
+
+    def _make_job(self, fn: Callable[..., Awaitable], args: tuple,
+                  commit: bool, timeout: float | None) -> _Job:
+        if self._closing:
+            raise RuntimeError("job queue is stopping")
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume)
+        return _Job(fn, args, commit,
+                    self.job_timeout if timeout is None else timeout,
+                    time.monotonic(), future)
+
+    def _enqueued(self) -> None:
+        depth = self._queue.qsize()
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    async def submit(self, fn: Callable[..., Awaitable], *args: Any,
+                     commit: bool = False,
+                     timeout: float | None = None) -> asyncio.Future:
+        """Queue `fn(*args)`, waiting for a free slot. The returned future
+        can be awaited for the result but doesn't have to be."""
+        job = self._make_job(fn, args, commit, timeout)
+        await self._queue.put(job)
+        self._enqueued()
+        return job.future
+
+    def submit_nowait(self, fn: Callable[..., Awaitable], *args: Any,
+                      commit: bool = False,
+                      timeout: float | None = None) -> asyncio.Future:
+        job = self._make_job(fn, args, commit, timeout)
+        self._queue.put_nowait(job)
+        self._enqueued()
+        return job.future
+
+    async def commit(self, aw: Awaitable) -> Any:
+        return await asyncio.shield(self._commit_task(aw))
+
+    def _commit_task(self, aw: Awaitable) -> asyncio.Future:
+        task = asyncio.ensure_future(aw)
+        self._committing.add(task)
+        task.add_done_callback(self._committing.discard)
+        return task
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: _Job) -> None:
+        started = time.monotonic()
+        self.wait_time.record(started - job.enqueued)
+        commit_task = None
+        try:
+            try:
+                async with asyncio.timeout(job.timeout):
+                    aw = job.fn(*job.args)
+                    if job.commit:
+                        commit_task = self._commit_task(aw)
+                        aw = asyncio.shield(commit_task)
+                    result = await aw
+            except TimeoutError:
+                if commit_task is None or commit_task.done():
+                    raise
+                self.timed_out += 1
+                logger.warning("commit job %r overran its %ss timeout",
+                               job.fn, job.timeout)
+                # воркер остается занят, пока commit не закончится: иначе
+                # он берет следующую задачу и выполняется больше `workers`
+                # задач сразу
+                result = await asyncio.shield(commit_task)
+        except TimeoutError as exc:
+            self.timed_out += 1
+            logger.warning("job %r timed out after %ss", job.fn, job.timeout)
+            if not job.future.done():
+                job.future.set_exception(exc)
+        except asyncio.CancelledError:
+            job.future.cancel()
+            # задача сама бросила CancelledError - воркер при этом живет
+            if asyncio.current_task().cancelling():
+                raise
+            self.failed += 1
+        except Exception as exc:
+            self.failed += 1
+            logger.exception("job %r failed", job.fn)
+            if not job.future.done():
+                job.future.set_exception(exc)
+        else:
+            self.completed += 1
+            # вызывающий мог сам отменить future, дождавшись не результата
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+            self.latency.record(time.monotonic() - job.enqueued)
+
+    async def stop(self, drain_timeout: float | None = None) -> None:
+        self._closing = True
+        try:
+            await asyncio.wait_for(
+                self._queue.join(),
+                self.drain_timeout if drain_timeout is None else drain_timeout)
+        except TimeoutError:
+            pass
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        while True:
+            while not self._queue.empty():
+                self._queue.get_nowait().future.cancel()
+                self._queue.task_done()
+                self.dropped += 1
+            # get_nowait() будит продюсеров, ждущих в put(): их задачи
+            # попадают в очередь на следующем витке цикла событий
+            await asyncio.sleep(0)
+            if self._queue.empty():
+                break
+        # фаза commit не прерывается даже после дедлайна
+        if self._committing:
+            await asyncio.gather(*self._committing, return_exceptions=True)
+
+    async def cleanup_ctx(self, app: web.Application):
+        self.start()
+        yield
+        await self.stop()
+
+    def stats(self) -> dict:
+        elapsed = time.monotonic() - self._started if self._started else 0.0
+        return {"depth": self.depth,
+                "max_depth": self.max_depth,
+                "completed": self.completed,
+                "failed": self.failed,
+                "timed_out": self.timed_out,
+                "dropped": self.dropped,
+                "throughput": self.completed / elapsed if elapsed else 0.0,
+                "wait_time": self.wait_time.snapshot(),
+                "latency": self.latency.snapshot()}
+
+
+JOB_QUEUE = AppKey("job_queue", JobQueue)
+
+
+def setup_job_queue(app: web.Application, **kwargs: Any) -> JobQueue:
+    jobs = JobQueue(**kwargs)
+    app[JOB_QUEUE] = jobs
+    app.cleanup_ctx.append(jobs.cleanup_ctx)
+    return jobs
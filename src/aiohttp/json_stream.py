@@ -0,0 +1,156 @@
+import re
+from typing import Any, AsyncIterator, Callable
+
+import aiohttp
+import orjson
+
+# вне строки интересны только структурные символы и кавычки,
+# остальное пропускается регулярным выражением на скорости C
+STRUCTURAL = re.compile(rb'["\[\]{},]')
+STRING_SPECIAL = re.compile(rb'["\\]')
+NON_WHITESPACE = re.compile(rb'\S')
+
+_START, _BETWEEN, _ELEMENT, _DONE = range(4)
+
+
+class JsonArrayParser:
+    """Incremental parser for a top-level JSON array.
+
+    feed() takes raw chunks and returns the elements completed so far, each
+    decoded separately with `loads` (orjson by default). The buffer only
+    holds the element being parsed, so memory is bounded by the largest
+    element rather than by the whole document.
+    """
+
+    def __init__(self, loads: Callable[[bytes], Any] = orjson.loads,
+                 max_element_size: int | None = None):
+        self.loads = loads
+        self.max_element_size = max_element_size
+        self.max_buffered = 0
+        self._buf = bytearray()
+        self._pos = 0
+        self._start = 0
+        self._state = _START
+        self._depth = 0
+        self._in_string = False
+        # последний разделитель между элементами: '[' или ',', None -
+        # после элемента (дальше ждем ',' или ']')
+        self._last: int | None = None
+
+    def feed(self, data: bytes) -> list[Any]:
+        if self._state == _DONE:
+            if data.strip():
+                raise ValueError("data after the end of the JSON array")
+            return []
+        buf = self._buf
+        buf += data
+        items: list[Any] = []
+        pos = self._pos
+        while self._state != _DONE:
+            if self._state != _ELEMENT:
+                m = NON_WHITESPACE.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                char, i = buf[m.start()], m.start()
+                if self._state == _START:
+                    if char != ord('['):
+                        raise ValueError("JSON document is not an array")
+                    self._state = _BETWEEN
+                    self._last = char
+                elif char == ord(']'):
+                    if self._last == ord(','):
+                        raise ValueError("trailing comma in the JSON array")
+                    self._state = _DONE
+                elif char == ord(','):
+                    if self._last is not None:
+                        raise ValueError("unexpected comma in the JSON array")
+                    self._last = char
+                else:
+                    if self._last is None:
+                        raise ValueError("missing comma in the JSON array")
+                    self._state = _ELEMENT
+                    self._start = i
+                    self._depth = 0
+                    pos = i
+                    continue
+                pos = i + 1
+                continue
+
+            if self._in_string:
+                m = STRING_SPECIAL.search(buf, pos)
+                if m is None:
+                    pos = len(buf)
+                    break
+                i = m.start()
+                if buf[i] == ord('\\'):
+                    if i + 1 >= len(buf):
+                        pos = i
+                        break
+                    pos = i + 2
+                    continue
+                self._in_string = False
+                pos = i + 1
+                if self._depth == 0:
+                    items.append(self._emit(pos))
+                continue
+
+            m = STRUCTURAL.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            char, i = buf[m.start()], m.start()
+            pos = i + 1
+            if char == ord('"'):
+                self._in_string = True
+            elif char in b'[{':
+                self._depth += 1
+            elif char in b']}':
+                if self._depth == 0:
+                    # закрывающая скобка самого массива после скаляра
+                    items.append(self._emit(i))
+                    self._state = _DONE
+                else:
+                    self._depth -= 1
+                    if self._depth == 0:
+                        items.append(self._emit(pos))
+            elif self._depth == 0:
+                # запятая после скаляра уже разобрана
+                items.append(self._emit(i))
+                self._last = char
+
+        self.max_buffered = max(self.max_buffered, len(buf))
+        # отбрасываем уже разобранное, оставляя только текущий элемент
+        keep_from = self._start if self._state == _ELEMENT else pos
+        del buf[:keep_from]
+        self._pos = pos - keep_from
+        self._start -= min(self._start, keep_from)
+        if (self.max_element_size is not None and self._state == _ELEMENT
+                and len(buf) > self.max_element_size):
+            raise ValueError("JSON array element is too large")
+        if self._state == _DONE and buf[self._pos:].strip():
+            raise ValueError("data after the end of the JSON array")
+        return items
+
+    def _emit(self, end: int) -> Any:
+        item = self.loads(self._buf[self._start:end])
+        self._state = _BETWEEN
+        self._last = None
+        return item
+
+    def close(self):
+        if self._state != _DONE:
+            raise ValueError("unexpected end of the JSON array")
+
+
+async def iter_json_array(content: aiohttp.StreamReader,
+                          chunk_size: int = 64 * 1024,
+                          loads: Callable[[bytes], Any] = orjson.loads,
+                          max_element_size: int | None = None
+                          ) -> AsyncIterator[Any]:
+    # async for event in iter_json_array(resp.content): ...
+    parser = JsonArrayParser(loads, max_element_size)
+    async for chunk in content.iter_chunked(chunk_size):
+        for item in parser.feed(chunk):
+            yield item
+    parser.close()
@@ -0,0 +1,272 @@
+"""Load benchmark for the small aiohttp apps from test_server.py.
+
+    python src/aiohttp/load_bench.py route_add class_based_view \\
+        --connections 64 --duration 10 --output result.json
+    python src/aiohttp/load_bench.py route_add --compare result.json
+
+The app runs in a child process (so its CPU time is measured separately)
+and is driven by an async load generator with keepalive connections.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import time
+from multiprocessing.connection import Connection
+from typing import Callable
+
+import aiohttp
+from aiohttp import web
+
+
+def app_route_add() -> web.Application:
+    async def hello(request):
+        return web.Response(text="Hello, world")
+
+    app = web.Application()
+    app.add_routes([web.get('/', hello)])
+    return app
+
+
+def app_json_response() -> web.Application:
+    async def hello(request):
+        return web.json_response({"key": "value"})
+
+    app = web.Application()
+    app.add_routes([web.get('/', hello)])
+    return app
+
+
+def app_class_based_view() -> web.Application:
+    class MyView(web.View):
+
+        async def get(self):
+            return web.Response(text="CBW get")
+
+        async def post(self):
+            return web.Response(text="CBW post")
+
+    app = web.Application()
+    app.add_routes([web.view('/', MyView)])
+    return app
+
+
+def app_fast_view() -> web.Application:
+    from fast_view import FastView, fast_view_routes
+
+    class MyView(FastView):
+        __slots__ = ()
+
+        async def get(self):
+            return web.Response(text="CBW get")
+
+        async def post(self):
+            return web.Response(text="CBW post")
+
+    app = web.Application()
+    app.add_routes(fast_view_routes('/', MyView))
+    return app
+
+
+def app_session() -> web.Application:
+    from aiohttp_session import get_session, setup
+    from aiohttp_session.cookie_storage import EncryptedCookieStorage
+    from cryptography import fernet
+
+    async def handler(request):
+        session = await get_session(request)
+        last_visit = session.get('count_visit', 1)
+        session['count_visit'] = last_visit + 1
+        return web.Response(text=f'visit :{last_visit}')
+
+    app = web.Application()
+    secret_key = base64.urlsafe_b64decode(fernet.Fernet.generate_key())
+    setup(app, EncryptedCookieStorage(secret_key))
+    app.add_routes([web.get('/', handler)])
+    return app
+
+
+def app_middleware() -> web.Application:
+    async def test(request):
+        return web.Response(text="Hello")
+
+    @web.middleware
+    async def middleware1(request, handler):
+        return await handler(request)
+
+    @web.middleware
+    async def middleware2(request, handler):
+        return await handler(request)
+
+    app = web.Application(middlewares=[middleware1, middleware2])
+    app.router.add_get('/', test)
+    return app
+
+
+def app_slow_response() -> web.Application:
+    async def hello(request):
+        # медленный ответ: параллельные запросы не делят одно соединение
+        await asyncio.sleep(0.2)
+        return web.Response(text="Hello, world")
+
+    app = web.Application()
+    app.add_routes([web.get('/', hello)])
+    return app
+
+
+APPS: dict[str, Callable[[], web.Application]] = {
+    "route_add": app_route_add,
+    "json_response": app_json_response,
+    "class_based_view": app_class_based_view,
+    "fast_view": app_fast_view,
+    "session": app_session,
+    "middleware": app_middleware,
+    "slow_response": app_slow_response,
+}
+
+
+def serve(app_name: str, conn: Connection):
+    # дочерний процесс: CPU считается между командами "start" и "stop",
+    # то есть без прогрева. Порт выбирает ОС (bind на 0), так что
+    # параллельные прогоны (pytest -n) не конкурируют за один порт
+    async def main():
+        runner = web.AppRunner(APPS[app_name](), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        loop = asyncio.get_running_loop()
+        conn.send(("ready", runner.addresses[0][1]))
+        await loop.run_in_executor(None, conn.recv)
+        cpu_start = time.process_time()
+        await loop.run_in_executor(None, conn.recv)
+        conn.send(time.process_time() - cpu_start)
+        await runner.cleanup()
+
+    asyncio.run(main())
+
+
+async def generate_load(url: str, connections: int,
+                        duration: float) -> tuple[list[float], int]:
+    latencies: list[float] = []
+    errors = 0
+    connector = aiohttp.TCPConnector(limit=connections)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while (started := time.perf_counter()) < deadline:
+                try:
+                    async with session.get(url) as resp:
+                        await resp.read()
+                        if resp.status >= 400:
+                            errors += 1
+                            continue
+                except aiohttp.ClientError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        await asyncio.gather(*[worker() for _ in range(connections)])
+    return latencies, errors
+
+
+def run_benchmark(app_name: str, connections: int = 64,
+                  duration: float = 10.0, warmup: float = 1.0) -> dict:
+    parent_conn, child_conn = multiprocessing.Pipe()
+    server = multiprocessing.Process(target=serve, args=(app_name, child_conn))
+    server.start()
+    try:
+        if not parent_conn.poll(30):
+            raise RuntimeError(f"server for {app_name!r} did not start")
+        _, port = parent_conn.recv()
+        url = f"http://127.0.0.1:{port}/"
+        if warmup:
+            asyncio.run(generate_load(url, connections, warmup))
+        parent_conn.send("start")
+        time_start = time.perf_counter()
+        latencies, errors = asyncio.run(
+            generate_load(url, connections, duration))
+        elapsed = time.perf_counter() - time_start
+        parent_conn.send("stop")
+        server_cpu = parent_conn.recv()
+    finally:
+        server.join(10)
+        if server.is_alive():
+            server.kill()
+
+    result = {
+        "app": app_name,
+        "connections": connections,
+        "duration": duration,
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "server_cpu_seconds": server_cpu,
+        "server_cpu_percent": 100 * server_cpu / elapsed,
+    }
+    if len(latencies) >= 2:
+        # inclusive: на малой выборке p99 не выходит за максимум
+        percentiles = statistics.quantiles(latencies, n=100,
+                                           method="inclusive")
+        result.update({
+            "latency_ms_p50": percentiles[49] * 1000,
+            "latency_ms_p90": percentiles[89] * 1000,
+            "latency_ms_p99": percentiles[98] * 1000,
+            "latency_ms_max": max(latencies) * 1000,
+        })
+    return result
+
+
+def compare(results: list[dict], baseline: list[dict]) -> list[str]:
+    by_app = {item["app"]: item for item in baseline}
+    lines = []
+    for result in results:
+        old = by_app.get(result["app"])
+        if old is None:
+            continue
+        parts = [result["app"]]
+        for metric in ("rps", "latency_ms_p99", "server_cpu_percent"):
+            if metric in result and old.get(metric):
+                change = (result[metric] / old[metric] - 1) * 100
+                parts.append(f"{metric} {old[metric]:.1f} -> "
+                             f"{result[metric]:.1f} ({change:+.1f}%)")
+        lines.append(", ".join(parts))
+    return lines
+
+
+def main(argv: list[str] | None = None) -> list[dict]:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("apps", nargs="+", choices=sorted(APPS))
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0)
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--compare", help="JSON results of a previous run")
+    args = parser.parse_args(argv)
+
+    results = []
+    for app_name in args.apps:
+        result = run_benchmark(app_name, args.connections, args.duration,
+                               args.warmup)
+        results.append(result)
+        print(json.dumps(result))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"python": platform.python_version(),
+                       "aiohttp": aiohttp.__version__,
+                       "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        for line in compare(results, baseline):
+            print(line)
+    return results
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,146 @@
+import asyncio
+import functools
+import json
+from dataclasses import dataclass
+from typing import Any, Callable
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+
+@dataclass(frozen=True, slots=True)
+class SharedResponse:
+    # тело прочитано один раз и отдается всем ожидающим
+    status: int
+    headers: CIMultiDictProxy[str]
+    url: URL
+    body: bytes
+
+    def text(self, encoding: str = "utf-8") -> str:
+        return self.body.decode(encoding)
+
+    def json(self, loads: Callable[[bytes | str], Any] = json.loads) -> Any:
+        return loads(self.body)
+
+
+class SingleFlightSession:
+    """Single-flight layer on top of ClientSession: concurrent identical
+    idempotent requests (method, normalized URL + query, `key_headers`)
+    share one in-flight request. With `ttl` the finished response is also
+    served from memory for that many seconds.
+
+    Only `params` and `headers` are part of the key, so a request with a
+    body or any other ClientSession.request() argument (`auth`, `cookies`,
+    `allow_redirects`, ...) is never shared and goes straight to the session.
+    URL userinfo is part of the key; a credential header
+    (CREDENTIAL_HEADERS) that is not in `key_headers` makes the request
+    bypass as well.
+
+    The upstream request runs in its own task, so cancelling the caller that
+    started it doesn't cancel it for everyone else.
+    """
+
+    IDEMPOTENT = frozenset({"GET", "HEAD", "OPTIONS"})
+    CREDENTIAL_HEADERS = ("Authorization", "Cookie", "Proxy-Authorization")
+
+    def __init__(self, session: aiohttp.ClientSession, *,
+                 key_headers: tuple[str, ...] = ("Authorization", "Cookie",
+                                                 "Accept"),
+                 ttl: float = 0.0, max_entries: int = 1024):
+        self.session = session
+        self.key_headers = key_headers
+        self._private_headers = tuple(
+            name for name in self.CREDENTIAL_HEADERS
+            if name.lower() not in {h.lower() for h in key_headers})
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.coalesced = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._in_flight: dict[tuple, asyncio.Task] = {}
+        self._cache: dict[tuple, tuple[float, SharedResponse]] = {}
+
+    def make_key(self, method: str, url: str | URL, params=None,
+                 headers=None) -> tuple:
+        url = URL(url)
+        if params:
+            url = url.update_query(params)
+        # имена заголовков без учета регистра, как их видит сервер
+        headers = CIMultiDict(headers or {})
+        return (
+            method,
+            url.scheme, url.user, url.password, url.host, url.port, url.path,
+            tuple(sorted(url.query.items())),
+            tuple((name.lower(), tuple(headers.getall(name)))
+                  for name in self.key_headers if name in headers),
+        )
+
+    async def get(self, url: str | URL, **kwargs) -> SharedResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def request(self, method: str, url: str | URL, *, params=None,
+                      headers=None, **kwargs) -> SharedResponse:
+        method = method.upper()
+        # data/json, auth, cookies и прочие аргументы в ключ не входят:
+        # такой запрос нельзя отдавать чужим ожидающим
+        if (method not in self.IDEMPOTENT or kwargs
+                or self._is_private(headers)):
+            self.bypassed += 1
+            return await self._fetch(method, url, params, headers, kwargs)
+
+        key = self.make_key(method, url, params, headers)
+        loop = asyncio.get_running_loop()
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > loop.time():
+                self.hits += 1
+                return cached[1]
+            del self._cache[key]
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.misses += 1
+            task = loop.create_task(
+                self._fetch(method, url, params, headers, kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(functools.partial(self._done, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _is_private(self, headers) -> bool:
+        # учетные данные, которых нет в ключе, разделять нельзя
+        if not headers or not self._private_headers:
+            return False
+        headers = CIMultiDict(headers)
+        return any(name in headers for name in self._private_headers)
+
+    async def _fetch(self, method, url, params, headers,
+                     kwargs) -> SharedResponse:
+        async with self.session.request(method, url, params=params,
+                                        headers=headers, **kwargs) as resp:
+            body = await resp.read()
+            return SharedResponse(resp.status, resp.headers, resp.url, body)
+
+    def _done(self, key: tuple, task: asyncio.Task):
+        del self._in_flight[key]
+        # exception() помечает ошибку как полученную, даже если
+        # все ожидающие уже отменены
+        if task.cancelled() or task.exception() is not None or not self.ttl:
+            return
+        if task.result().status >= 500:
+            return
+        if len(self._cache) >= self.max_entries:
+            now = asyncio.get_running_loop().time()
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+            while len(self._cache) >= self.max_entries:
+                del self._cache[next(iter(self._cache))]
+        expires = asyncio.get_running_loop().time() + self.ttl
+        self._cache[key] = (expires, task.result())
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "coalesced": self.coalesced,
+                "misses": self.misses, "bypassed": self.bypassed,
+                "in_flight": len(self._in_flight)}
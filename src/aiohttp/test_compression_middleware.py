@@ -0,0 +1,124 @@
+import asyncio
+import json
+import time
+
+import pytest
+from aiohttp import web
+from compression_middleware import (COMPRESSORS, compression_middleware,
+                                    negotiate_encoding)
+from loop_monitor import LoopMonitor
+
+DATA = [{"id": i, "type": "PushEvent", "repo": f"user/repo_{i}"}
+        for i in range(20_000)]
+BODY = json.dumps(DATA).encode()
+RAW_SIZE = len(BODY)
+
+
+class TestCompressionMiddleware:
+
+    async def make_client(self, aiohttp_client, middlewares, **client_kwargs):
+        async def big_json(request):
+            return web.json_response(DATA)
+
+        async def small(request):
+            return web.Response(text="small")
+
+        async def prebuilt(request):
+            return web.Response(body=BODY, content_type="application/json")
+
+        async def with_etag(request):
+            return web.json_response(DATA, headers={"ETag": '"v1"'})
+
+        async def with_same_etag(request):
+            # другой ресурс с тем же ETag
+            return web.json_response(DATA[:1000], headers={"ETag": '"v1"'})
+
+        app = web.Application(middlewares=middlewares)
+        app.add_routes([web.get('/big', big_json),
+                        web.get('/small', small),
+                        web.get('/prebuilt', prebuilt),
+                        web.get('/etag', with_etag),
+                        web.get('/etag_other', with_same_etag)])
+        return await aiohttp_client(app, **client_kwargs)
+
+    def test_negotiate(self):
+        assert negotiate_encoding("gzip, deflate") == "gzip"
+        assert negotiate_encoding("deflate") == "deflate"
+        assert negotiate_encoding("gzip;q=0.5, deflate") == "deflate"
+        assert negotiate_encoding("gzip;q=0, identity") is None
+        assert negotiate_encoding("") is None
+        assert negotiate_encoding("*") == next(iter(COMPRESSORS))
+
+    @pytest.mark.asyncio
+    async def test_compress(self, aiohttp_client):
+        client = await self.make_client(aiohttp_client,
+                                        [compression_middleware()])
+        for encoding in ("gzip", "deflate"):
+            resp = await client.get('/big',
+                                    headers={"Accept-Encoding": encoding})
+            assert resp.status == 200
+            assert resp.headers["Content-Encoding"] == encoding
+            assert resp.headers["Vary"] == "Accept-Encoding"
+            assert int(resp.headers["Content-Length"]) < RAW_SIZE // 5
+            # клиент aiohttp распаковывает тело сам
+            assert await resp.json() == DATA
+
+        resp = await client.get('/big', headers={"Accept-Encoding": "identity"})
+        assert "Content-Encoding" not in resp.headers
+        assert await resp.json() == DATA
+
+    @pytest.mark.asyncio
+    async def test_skip_small(self, aiohttp_client):
+        client = await self.make_client(aiohttp_client,
+                                        [compression_middleware()])
+        resp = await client.get('/small', headers={"Accept-Encoding": "gzip"})
+        assert "Content-Encoding" not in resp.headers
+        assert await resp.text() == "small"
+
+    @pytest.mark.asyncio
+    async def test_cache_by_etag(self, aiohttp_client):
+        middleware = compression_middleware()
+        client = await self.make_client(aiohttp_client, [middleware])
+        for _ in range(3):
+            resp = await client.get('/etag',
+                                    headers={"Accept-Encoding": "gzip"})
+            assert resp.headers["ETag"] == 'W/"v1"'
+            assert await resp.json() == DATA
+        resp = await client.get('/big', headers={"Accept-Encoding": "gzip"})
+        await resp.read()
+        assert list(middleware.cache) == [('/etag', '"v1"', "gzip")]
+
+        resp = await client.get('/etag_other',
+                                headers={"Accept-Encoding": "gzip"})
+        assert await resp.json() == DATA[:1000]
+        assert list(middleware.cache) == [('/etag', '"v1"', "gzip"),
+                                          ('/etag_other', '"v1"', "gzip")]
+
+    @pytest.mark.asyncio
+    async def test_benchmark_loop_lag(self, aiohttp_client):
+        n = 50
+        for name, middlewares in (
+                ("no compression", []),
+                ("inline gzip", [compression_middleware(offload_size=2 ** 62)]),
+                ("offloaded gzip", [compression_middleware()])):
+            # сериализация и распаковка на клиенте не должны влиять на замер
+            client = await self.make_client(aiohttp_client, middlewares,
+                                            auto_decompress=False)
+            received = 0
+
+            async def fetch():
+                nonlocal received
+                resp = await client.get('/prebuilt',
+                                        headers={"Accept-Encoding": "gzip"})
+                received += int(resp.headers["Content-Length"])
+                await resp.read()
+
+            with LoopMonitor(interval=0.005) as monitor:
+                time_start = time.perf_counter()
+                await asyncio.gather(*[fetch() for _ in range(n)])
+                elapsed = time.perf_counter() - time_start
+            print(f"\n{name}: {n / elapsed:.1f} req/s, "
+                  f"{received // n} bytes/response, loop lag "
+                  f"p99 {monitor.lag.percentile(99) * 1000:.1f}ms "
+                  f"max {monitor.lag.max * 1000:.1f}ms")
+            await client.close()
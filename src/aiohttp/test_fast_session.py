@@ -0,0 +1,112 @@
+import asyncio
+import multiprocessing
+import time
+
+import aiohttp
+import pytest
+from aiohttp import web
+from fast_session import SingleHostCookieJar, encode_cookies, fast_session
+from load_bench import serve
+from yarl import URL
+
+
+async def echo(request):
+    resp = web.json_response({"headers": dict(request.headers),
+                              "cookies": dict(request.cookies)})
+    if "set" in request.query:
+        resp.set_cookie("server_cookie", request.query["set"])
+    if "delete" in request.query:
+        resp.del_cookie("server_cookie")
+    return resp
+
+
+class TestFastSession:
+
+    def test_encode_cookies(self):
+        assert encode_cookies({"a": "1", "b": "x y"}) == 'a=1; b="x y"'
+
+    @pytest.mark.asyncio
+    async def test_constant_headers_and_cookies(self, aiohttp_server):
+        app = web.Application()
+        app.add_routes([web.get('/', echo)])
+        server = await aiohttp_server(app)
+        async with fast_session(headers={"dav_header": "header_value"},
+                                cookies={"cookies_are": "working"}) as session:
+            for _ in range(2):
+                async with session.get(server.make_url('/?set=1')) as resp:
+                    body = await resp.json()
+                assert body["headers"]["dav_header"] == "header_value"
+                # кука от сервера не запоминается (DummyCookieJar)
+                assert body["cookies"] == {"cookies_are": "working"}
+
+            # куки конкретного запроса все равно работают
+            async with session.get(server.make_url('/'),
+                                   cookies={"extra": "1"}) as resp:
+                body = await resp.json()
+            assert body["cookies"] == {"cookies_are": "working", "extra": "1"}
+
+    @pytest.mark.asyncio
+    async def test_single_host_jar(self, aiohttp_server):
+        app = web.Application()
+        app.add_routes([web.get('/', echo)])
+        server = await aiohttp_server(app)
+        jar = SingleHostCookieJar(server.host)
+        async with fast_session(cookie_jar=jar) as session:
+            async def cookies(query: str = "") -> dict:
+                async with session.get(server.make_url('/' + query)) as resp:
+                    return (await resp.json())["cookies"]
+
+            assert await cookies("?set=1") == {}
+            assert await cookies() == {"server_cookie": "1"}
+            assert await cookies("?delete=1") == {"server_cookie": "1"}
+            assert await cookies() == {}
+        assert not jar.filter_cookies(URL("http://other.example/"))
+
+    def test_benchmark_client_cpu(self):
+        # сервер в отдельном процессе: process_time здесь - только клиент;
+        # приложение session ставит куку в каждом ответе
+        n = 2000
+        parent_conn, child_conn = multiprocessing.Pipe()
+        server = multiprocessing.Process(target=serve,
+                                         args=("session", child_conn))
+        server.start()
+        try:
+            assert parent_conn.poll(30)
+            _, port = parent_conn.recv()
+            url = URL(f"http://127.0.0.1:{port}/")
+            parent_conn.send("start")
+
+            async def run(make_session) -> float:
+                async with make_session() as session:
+                    async def worker():
+                        for _ in range(n // 8):
+                            async with session.get(url) as resp:
+                                await resp.read()
+
+                    await worker()  # прогрев соединения
+                    cpu_start = time.process_time()
+                    await asyncio.gather(*[worker() for _ in range(8)])
+                    return (time.process_time() - cpu_start) / n
+
+            headers = {"dav_header": "header_value"}
+            cookies = {"cookies_are": "working"}
+            variants = {
+                # unsafe=True: иначе CookieJar молча отбрасывает куки от IP
+                "default CookieJar": lambda: aiohttp.ClientSession(
+                    headers=headers, cookies=cookies,
+                    cookie_jar=aiohttp.CookieJar(unsafe=True)),
+                "SingleHostCookieJar": lambda: fast_session(
+                    headers=headers, cookies=cookies,
+                    cookie_jar=SingleHostCookieJar(url.host)),
+                "fast_session": lambda: fast_session(headers=headers,
+                                                     cookies=cookies),
+            }
+            for name, make_session in variants.items():
+                cpu = asyncio.run(run(make_session))
+                print(f"\n{name}: {cpu * 1e6:.0f}us client CPU/request")
+            parent_conn.send("stop")
+            parent_conn.recv()
+        finally:
+            server.join(10)
+            if server.is_alive():
+                server.kill()
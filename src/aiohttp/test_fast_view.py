@@ -0,0 +1,79 @@
+import time
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import make_mocked_request
+from fast_view import FastView, fast_view_routes
+
+
+class MyView(FastView):
+    __slots__ = ()
+
+    async def get(self):
+        return web.Response(text=f"CBW get {self.request.path}")
+
+    async def post(self):
+        return web.Response(text="CBW post")
+
+
+class MyWebView(web.View):
+
+    async def get(self):
+        return web.Response(text=f"CBW get {self.request.path}")
+
+    async def post(self):
+        return web.Response(text="CBW post")
+
+
+class TestFastView:
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("view_cls", [MyView, MyWebView])
+    async def test_dispatch(self, aiohttp_client, view_cls):
+        app = web.Application()
+        app.add_routes(fast_view_routes('/root', view_cls, name="root_name"))
+        client = await aiohttp_client(app)
+
+        resp = await client.get('/root')
+        assert resp.status == 200
+        assert await resp.text() == "CBW get /root"
+
+        resp = await client.post('/root')
+        assert await resp.text() == "CBW post"
+
+        resp = await client.put('/root')
+        assert resp.status == 405
+        assert resp.headers["Allow"] == "GET,POST"
+
+        assert str(app.router["root_name"].url_for()) == "/root"
+
+    def test_no_handlers(self):
+        with pytest.raises(ValueError):
+            fast_view_routes('/root', FastView)
+
+    def test_slots(self):
+        assert not hasattr(MyView(None), "__dict__")
+
+    @pytest.mark.asyncio
+    async def test_benchmark_dispatch(self):
+        # маршрутизация и вызов обработчика без сети: разница только
+        # в диспетчеризации
+        n = 20_000
+        for name, routes in (
+                ("web.View", [web.view('/root', MyWebView)]),
+                ("fast_view_routes", fast_view_routes('/root', MyView))):
+            app = web.Application()
+            app.add_routes(routes)
+            app.freeze()
+            for method, status in (("GET", 200), ("PUT", 405)):
+                request = make_mocked_request(method, '/root', app=app)
+                time_start = time.perf_counter()
+                for _ in range(n):
+                    match_info = await app.router.resolve(request)
+                    try:
+                        resp = await match_info.handler(request)
+                    except web.HTTPException as exc:
+                        resp = exc
+                assert resp.status == status
+                elapsed = time.perf_counter() - time_start
+                print(f"\n{name} {method}: {elapsed / n * 1e6:.2f}us/request")
@@ -0,0 +1,232 @@
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import pytest
+from aiohttp import web
+from http_cache import (CacheEntry, CachingSession, DiskStore,
+                        parse_cache_control)
+
+LARGE_BODY = b"x" * (512 * 1024)
+
+
+class TestHttpCache:
+
+    async def make_server(self, aiohttp_server, list_request: list[str]):
+        async def max_age(request):
+            list_request.append("max_age")
+            return web.json_response(
+                [{"id": 1}], headers={"Cache-Control": "max-age=60"})
+
+        async def etag(request):
+            list_request.append("etag")
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304, headers={"ETag": '"v1"'})
+            return web.Response(text="events",
+                                headers={"ETag": '"v1"',
+                                         "Cache-Control": "no-cache"})
+
+        async def last_modified(request):
+            list_request.append("last_modified")
+            date = "Wed, 21 Oct 2015 07:28:00 GMT"
+            if request.headers.get("If-Modified-Since") == date:
+                return web.Response(status=304)
+            return web.Response(text="data",
+                                headers={"Last-Modified": date,
+                                         "Cache-Control": "max-age=0"})
+
+        async def no_store(request):
+            list_request.append("no_store")
+            return web.Response(text="secret",
+                                headers={"Cache-Control": "no-store"})
+
+        async def large(request):
+            list_request.append(f"large_{request.query.get('n', '')}")
+            if request.headers.get("If-None-Match") == '"large"':
+                return web.Response(status=304)
+            return web.Response(body=LARGE_BODY,
+                                headers={"ETag": '"large"',
+                                         "Cache-Control": "max-age=0"})
+
+        async def vary(request):
+            list_request.append("vary")
+            return web.Response(text=request.headers.get("Accept", ""),
+                                headers={"Vary": "Accept",
+                                         "Cache-Control": "max-age=60"})
+
+        app = web.Application()
+        app.add_routes([web.get('/max_age', max_age),
+                        web.get('/etag', etag),
+                        web.get('/last_modified', last_modified),
+                        web.get('/no_store', no_store),
+                        web.get('/large', large),
+                        web.get('/vary', vary)])
+        return await aiohttp_server(app)
+
+    def test_parse_cache_control(self):
+        assert parse_cache_control('max-age=60, no-cache, private="x"') == \
+            {"max-age": "60", "no-cache": None, "private": "x"}
+        assert parse_cache_control(None) == {}
+
+    @pytest.mark.asyncio
+    async def test_fresh_hit(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        async with aiohttp.ClientSession() as session:
+            cache = CachingSession(session)
+            for _ in range(3):
+                resp = await cache.get(server.make_url('/max_age'))
+                assert resp.json() == [{"id": 1}]
+
+        assert list_request == ["max_age"]
+        assert [cache.misses, cache.hits] == [1, 2]
+        assert resp.cache_status == "hit"
+
+    @pytest.mark.asyncio
+    async def test_etag_revalidation(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        async with aiohttp.ClientSession() as session:
+            cache = CachingSession(session)
+            first = await cache.get(server.make_url('/etag'))
+            second = await cache.get(server.make_url('/etag'))
+
+        assert list_request == ["etag", "etag"]
+        assert first.cache_status == "miss"
+        assert second.cache_status == "revalidated"
+        assert second.status == 200
+        assert second.read() == b"events"
+
+    @pytest.mark.asyncio
+    async def test_last_modified_revalidation(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        async with aiohttp.ClientSession() as session:
+            cache = CachingSession(session)
+            await cache.get(server.make_url('/last_modified'))
+            resp = await cache.get(server.make_url('/last_modified'))
+
+        assert resp.cache_status == "revalidated"
+        assert resp.read() == b"data"
+        assert cache.stats()["revalidation_rate"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_no_store(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        async with aiohttp.ClientSession() as session:
+            cache = CachingSession(session)
+            await cache.get(server.make_url('/no_store'))
+            await cache.get(server.make_url('/no_store'))
+            # no-store в запросе - кеш не используется совсем
+            resp = await cache.get(server.make_url('/max_age'),
+                                   headers={"Cache-Control": "no-store"})
+
+        assert list_request == ["no_store", "no_store", "max_age"]
+        assert resp.cache_status == "bypass"
+        assert cache.memory.size == 0
+
+    @pytest.mark.asyncio
+    async def test_credentials_bypass(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/max_age')
+        async with aiohttp.ClientSession() as session:
+            cache = CachingSession(session)
+            list_resp = [
+                await cache.get(url, auth=aiohttp.BasicAuth("alice")),
+                await cache.get(url, auth=aiohttp.BasicAuth("bob")),
+                await cache.get(url, headers={"Authorization": "alice"}),
+                await cache.get(url, headers={"cookie": "sid=bob"}),
+            ]
+            await cache.get(url)
+            resp = await cache.get(url)
+
+        # ответы с учетными данными не кешируются и не берутся из кеша
+        assert [r.cache_status for r in list_resp] == ["bypass"] * 4
+        assert resp.cache_status == "hit"
+        assert list_request == ["max_age"] * 5
+
+    @pytest.mark.asyncio
+    async def test_vary(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/vary')
+        async with aiohttp.ClientSession() as session:
+            cache = CachingSession(session)
+            await cache.get(url, headers={"Accept": "text/plain"})
+            resp = await cache.get(url, headers={"Accept": "text/plain"})
+            assert resp.cache_status == "hit"
+            resp = await cache.get(url, headers={"Accept": "text/html"})
+            assert resp.cache_status == "miss"
+            assert resp.read() == b"text/html"
+
+    @pytest.mark.asyncio
+    async def test_large_entry_on_disk(self, aiohttp_server, tmp_path):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        async with aiohttp.ClientSession() as session:
+            cache = CachingSession(session, cache_dir=tmp_path)
+            await cache.get(server.make_url('/large'))
+            resp = await cache.get(server.make_url('/large'))
+
+        assert resp.cache_status == "revalidated"
+        assert isinstance(resp.body, mmap.mmap)
+        assert resp.read() == LARGE_BODY
+        assert cache.memory.size == 0
+        assert cache.disk.size == len(LARGE_BODY)
+
+        # индекс восстанавливается после перезапуска
+        assert DiskStore(tmp_path, 10 ** 9).size == len(LARGE_BODY)
+
+    @pytest.mark.asyncio
+    async def test_disk_eviction(self, aiohttp_server, tmp_path):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        async with aiohttp.ClientSession() as session:
+            cache = CachingSession(session, cache_dir=tmp_path,
+                                   disk_max_bytes=2 * len(LARGE_BODY))
+            for n in range(3):
+                await cache.get(server.make_url('/large'), params={"n": n})
+
+        assert cache.disk.size == 2 * len(LARGE_BODY)
+        assert len(list(tmp_path.glob("*.body"))) == 2
+
+    def test_disk_concurrent_put(self, tmp_path):
+        store = DiskStore(tmp_path, 10 ** 9)
+
+        def put(n: int):
+            body = bytes([n]) * len(LARGE_BODY)
+            store.put("key", CacheEntry(200, [], "/", 0.0, body=body))
+
+        with ThreadPoolExecutor(8) as executor:
+            list(executor.map(put, range(32)))
+
+        # тело целиком от одной записи, временных файлов не осталось
+        body = store.get("key").body
+        assert body[:] == body[:1] * len(LARGE_BODY)
+        assert list(tmp_path.glob("*.tmp")) == []
+        assert store.size == len(LARGE_BODY)
+
+    def test_disk_broken_entries_skipped(self, tmp_path):
+        store = DiskStore(tmp_path, 10 ** 9)
+        for key in ("ok", "no_body", "corrupt"):
+            store.put(key, CacheEntry(200, [], "/", 0.0, body=b"body"))
+        no_body_meta, no_body = store._paths("no_body")
+        no_body.unlink()
+        corrupt_meta, corrupt_body = store._paths("corrupt")
+        corrupt_meta.write_text("{not json")
+
+        orphan_body = tmp_path / ("0" * 64 + ".body")
+        orphan_body.write_bytes(b"x" * 100)
+        stray_tmp = tmp_path / "crashed.tmp"
+        stray_tmp.write_bytes(b"x" * 100)
+
+        store = DiskStore(tmp_path, 10 ** 9)
+        assert store.size == 4
+        assert not orphan_body.exists() and not stray_tmp.exists()
+        assert len(list(tmp_path.iterdir())) == 2
+        assert store.get("ok").body[:] == b"body"
+        assert store.get("no_body") is None
+        for path in (no_body_meta, corrupt_meta, corrupt_body):
+            assert not path.exists()
@@ -0,0 +1,171 @@
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+from job_queue import JOB_QUEUE, JobQueue, setup_job_queue
+
+
+class TestJobQueue:
+
+    @pytest.mark.asyncio
+    async def test_result_and_errors(self):
+        jobs = JobQueue(workers=2)
+        jobs.start()
+
+        async def double(x):
+            await asyncio.sleep(0.01)
+            return x * 2
+
+        async def fail():
+            raise ValueError("boom")
+
+        async def cancel_itself():
+            raise asyncio.CancelledError
+
+        futures = [await jobs.submit(double, i) for i in range(10)]
+        assert await asyncio.gather(*futures) == [i * 2 for i in range(10)]
+        with pytest.raises(ValueError):
+            await (await jobs.submit(fail))
+        await jobs.submit(cancel_itself)
+        # воркеры пережили CancelledError из задачи
+        assert await (await jobs.submit(double, 21)) == 42
+
+        await jobs.stop()
+        stats = jobs.stats()
+        assert stats["completed"] == 11 and stats["failed"] == 2
+        assert stats["latency"]["count"] == 13
+        with pytest.raises(RuntimeError):
+            await jobs.submit(double, 1)
+
+    @pytest.mark.asyncio
+    async def test_backpressure(self):
+        jobs = JobQueue(workers=1, maxsize=2)
+        jobs.start()
+        release = asyncio.Event()
+
+        async def blocked():
+            await release.wait()
+
+        await jobs.submit(blocked)
+        await asyncio.sleep(0)  # воркер забрал первую задачу
+        await jobs.submit(blocked)
+        await jobs.submit(blocked)
+        assert jobs.depth == 2
+        with pytest.raises(asyncio.QueueFull):
+            jobs.submit_nowait(blocked)
+        producer = asyncio.create_task(jobs.submit(blocked))
+        await asyncio.sleep(0.05)
+        assert not producer.done()
+
+        release.set()
+        await producer
+        await jobs.stop()
+        assert jobs.completed == 4 and jobs.max_depth == 2
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        jobs = JobQueue(job_timeout=0.05)
+        jobs.start()
+        future = await jobs.submit(asyncio.sleep, 1)
+        with pytest.raises(TimeoutError):
+            await future
+        assert await (await jobs.submit(asyncio.sleep, 1, "ok",
+                                        timeout=2)) == "ok"
+        await jobs.stop()
+        assert jobs.timed_out == 1
+
+    @pytest.mark.asyncio
+    async def test_commit_job_timeout(self):
+        jobs = JobQueue(workers=1, job_timeout=0.05)
+        jobs.start()
+        loop = asyncio.get_running_loop()
+        list_time: list[float] = []
+
+        async def write(delay: float):
+            list_time.append(loop.time())
+            await asyncio.sleep(delay)
+            return "written"
+
+        committed = await jobs.submit(write, 0.2, commit=True)
+        queued = await jobs.submit(write, 0, timeout=1)
+        # вызывающий получает настоящий результат commit, а не TimeoutError
+        assert await committed == "written"
+        await queued
+        # следующая задача не началась раньше, чем закончился commit
+        assert list_time[1] - list_time[0] >= 0.19
+        await jobs.stop()
+        assert jobs.timed_out == 1 and jobs.completed == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_with_blocked_producer(self):
+        jobs = JobQueue(workers=1, maxsize=1)
+        jobs.start()
+        release = asyncio.Event()
+
+        await jobs.submit(release.wait)
+        await asyncio.sleep(0)  # воркер забрал первую задачу
+        await jobs.submit(release.wait)
+        producer = asyncio.create_task(jobs.submit(release.wait))
+        await asyncio.sleep(0)
+        assert not producer.done()
+
+        await jobs.stop(drain_timeout=0.05)
+        # задача продюсера попала в очередь уже без воркеров - ее
+        # future отменен, а не висит
+        assert (await producer).cancelled()
+        assert jobs.depth == 0
+        assert jobs.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_deadline_and_commit(self):
+        jobs = JobQueue(workers=2)
+        jobs.start()
+        list_message: list[str] = []
+
+        async def write(name: str, delay: float):
+            await asyncio.sleep(delay)
+            list_message.append(name)
+
+        async def two_phase():
+            await asyncio.sleep(1)  # подготовка прерывается
+            await jobs.commit(write("never", 0))
+
+        async def prepare_then_commit():
+            await jobs.commit(write("commit", 0.3))
+
+        await jobs.submit(two_phase)
+        await jobs.submit(prepare_then_commit)
+        await jobs.submit(write, "queued", 0)
+        await asyncio.sleep(0)
+
+        time_start = time.perf_counter()
+        await jobs.stop(drain_timeout=0.1)
+        # стоп дождался commit, хотя дедлайн наступил раньше
+        assert 0.25 < time.perf_counter() - time_start < 1
+        assert list_message == ["commit"]
+        assert jobs.dropped == 1
+
+    @pytest.mark.asyncio
+    async def test_drain_on_app_shutdown(self, aiohttp_client):
+        list_message: list[str] = []
+
+        async def send_email(to: str):
+            await asyncio.sleep(0.2)
+            list_message.append(to)
+
+        async def handler(request):
+            await request.app[JOB_QUEUE].submit(send_email, "user@example")
+            return web.Response(text="accepted")
+
+        app = web.Application()
+        setup_job_queue(app, workers=2)
+        app.router.add_post('/', handler)
+        client = await aiohttp_client(app)
+        resp = await client.post('/')
+        assert await resp.text() == "accepted"
+        assert list_message == []
+        # раньше create_task из обработчика терялся при остановке
+        await client.close()
+        assert list_message == ["user@example"]
+
@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import orjson
+import pytest
+from aiohttp import web
+from json_stream import JsonArrayParser, iter_json_array
+
+
+class TestJsonArrayParser:
+    doc = [
+        {"id": 1, "type": "PushEvent", "payload": {"commits": [1, 2, [3]]}},
+        "string with ] and } and , inside",
+        "escaped \" quote and \\ backslash",
+        12.5, -3, True, False, None,
+        [], {}, [[{"a": "[{"}]],
+        "юникод",
+    ]
+
+    def test_split_at_every_byte(self):
+        data = json.dumps(self.doc, ensure_ascii=False).encode()
+        for split in range(len(data) + 1):
+            parser = JsonArrayParser()
+            items = parser.feed(data[:split]) + parser.feed(data[split:])
+            parser.close()
+            assert items == self.doc
+
+    def test_byte_by_byte(self):
+        data = json.dumps(self.doc).encode()
+        parser = JsonArrayParser()
+        items = []
+        for i in range(len(data)):
+            items.extend(parser.feed(data[i:i + 1]))
+        parser.close()
+        assert items == self.doc
+
+    def test_empty_and_whitespace(self):
+        parser = JsonArrayParser()
+        assert parser.feed(b"  \n[ \n ]  ") == []
+        parser.close()
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            JsonArrayParser().feed(b'{"a": 1}')
+        with pytest.raises(ValueError):
+            JsonArrayParser().feed(b'[1, 2] 3')
+        with pytest.raises(ValueError):
+            parser = JsonArrayParser()
+            parser.feed(b'[1, 2')
+            parser.close()
+        with pytest.raises(ValueError):
+            JsonArrayParser(max_element_size=10).feed(b'["' + b"x" * 100)
+        # лишние и пропущенные запятые, как в resp.json()
+        for data in (b'[1,,2]', b'[,1]', b'[1,]', b'[{"a": 1},]',
+                     b'["a" "b"]', b'[[1],,[2]]', b'[,]'):
+            parser = JsonArrayParser()
+            with pytest.raises(ValueError):
+                parser.feed(data)
+
+    def test_memory_bounded_by_element(self):
+        element = {"payload": "x" * 1000}
+        data = orjson.dumps([element] * 1000)
+        parser = JsonArrayParser()
+        count = 0
+        for i in range(0, len(data), 4096):
+            count += len(parser.feed(data[i:i + 4096]))
+        parser.close()
+        assert count == 1000
+        # буфер - не больше одного элемента плюс один кусок
+        assert parser.max_buffered < 4096 + 2 * len(orjson.dumps(element))
+
+    @pytest.mark.asyncio
+    async def test_stream_from_response(self, aiohttp_client):
+        # аналог test_response_json, но элементы приходят по одному
+        async def events(request):
+            resp = web.StreamResponse()
+            resp.content_type = "application/json"
+            await resp.prepare(request)
+            await resp.write(b'[{"id": 0}')
+            await asyncio.sleep(0.2)
+            for i in range(1, 1000):
+                await resp.write(b',' + orjson.dumps({"id": i}))
+            await resp.write(b']')
+            return resp
+
+        app = web.Application()
+        app.add_routes([web.get('/events', events)])
+        client = await aiohttp_client(app)
+
+        loop = asyncio.get_running_loop()
+        time_start = loop.time()
+        resp = await client.get('/events')
+        list_id = []
+        time_first = None
+        async for event in iter_json_array(resp.content):
+            if time_first is None:
+                time_first = loop.time() - time_start
+            list_id.append(event["id"])
+
+        assert list_id == list(range(1000))
+        # первый элемент доступен до того, как пришел весь ответ
+        assert time_first < 0.2
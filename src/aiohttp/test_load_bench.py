@@ -0,0 +1,39 @@
+import json
+
+import pytest
+from load_bench import APPS, compare, main, run_benchmark
+
+
+class TestLoadBench:
+
+    @pytest.mark.parametrize("app_name", sorted(APPS))
+    def test_run_benchmark(self, app_name):
+        result = run_benchmark(app_name, connections=4, duration=0.3,
+                               warmup=0.1)
+        assert result["app"] == app_name
+        assert result["errors"] == 0
+        assert result["requests"] > 0
+        assert result["rps"] > 0
+        assert result["server_cpu_seconds"] > 0
+        assert result["latency_ms_p50"] <= result["latency_ms_p99"] \
+            <= result["latency_ms_max"]
+
+    def test_main_output_and_compare(self, tmp_path, capsys):
+        output = tmp_path / "result.json"
+        main(["route_add", "--connections", "2", "--duration", "0.2",
+              "--warmup", "0", "--output", str(output)])
+        saved = json.loads(output.read_text())
+        assert [r["app"] for r in saved["results"]] == ["route_add"]
+
+        main(["route_add", "--connections", "2", "--duration", "0.2",
+              "--warmup", "0", "--compare", str(output)])
+        assert "route_add, rps" in capsys.readouterr().out
+
+    def test_compare(self):
+        baseline = [{"app": "route_add", "rps": 100.0,
+                     "latency_ms_p99": 10.0}]
+        results = [{"app": "route_add", "rps": 110.0, "latency_ms_p99": 9.0},
+                   {"app": "session", "rps": 50.0}]
+        assert compare(results, baseline) == [
+            "route_add, rps 100.0 -> 110.0 (+10.0%), "
+            "latency_ms_p99 10.0 -> 9.0 (-10.0%)"]
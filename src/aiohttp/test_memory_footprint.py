@@ -0,0 +1,199 @@
+import asyncio
+import gc
+import multiprocessing
+import tracemalloc
+from collections import deque
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+
+import aiohttp
+import pytest
+from aiohttp import web
+from app_key import AppKey
+from job_queue import JobQueue
+from load_bench import APPS, serve
+
+N_TASKS = 10_000
+N_CONNECTIONS = 200
+
+
+class Traced:
+    """Bytes allocated (and still alive) inside the block, per object."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self.per_object = 0.0
+
+    def __enter__(self):
+        gc.collect()
+        tracemalloc.start()
+        self._start = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def __exit__(self, *exc_info):
+        gc.collect()
+        used = tracemalloc.get_traced_memory()[0] - self._start
+        tracemalloc.stop()
+        self.per_object = used / self.n
+
+    @classmethod
+    def size_of(cls, factory, n: int = 10_000) -> float:
+        with cls(n) as traced:
+            objects = [factory() for _ in range(n)]
+        del objects
+        return traced.per_object
+
+
+# состояние одного подключения (как _Subscriber в websocket_hub)
+# в трех вариантах; очередь создается лениво
+def state_dict(ws, request):
+    return {"ws": ws, "request": request, "queue": None,
+            "writing": False, "closing": None}
+
+
+class StateClass:
+    def __init__(self, ws, request):
+        self.ws = ws
+        self.request = request
+        self.queue = None
+        self.writing = False
+        self.closing = None
+
+
+@dataclass(slots=True)
+class StateSlots:
+    ws: object
+    request: object
+    queue: deque | None = None
+    writing: bool = False
+    closing: object = None
+
+
+async def open_keepalive(session: aiohttp.ClientSession, url: str, n: int):
+    async def fetch():
+        async with session.get(url) as resp:
+            await resp.read()
+
+    await asyncio.gather(*[fetch() for _ in range(n)])
+
+
+def hold_connections(url: str, n: int, conn: Connection):
+    async def main():
+        connector = aiohttp.TCPConnector(limit=0)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await open_keepalive(session, url, n)
+            conn.send("connected")
+            await asyncio.to_thread(conn.recv)
+
+    asyncio.run(main())
+
+
+class TestMemoryFootprint:
+
+    @pytest.mark.asyncio
+    async def test_idle_task_and_queued_job(self):
+        event = asyncio.Event()
+        with Traced(N_TASKS) as per_task:
+            tasks = [asyncio.create_task(event.wait()) for _ in range(N_TASKS)]
+            await asyncio.sleep(0)
+
+        jobs = JobQueue(workers=1, maxsize=0)
+        jobs.start()
+        await jobs.submit(event.wait)
+        await asyncio.sleep(0)
+        with Traced(N_TASKS) as per_job:
+            for _ in range(N_TASKS):
+                jobs.submit_nowait(event.wait)
+        assert jobs.depth == N_TASKS
+
+        event.set()
+        await asyncio.gather(*tasks)
+        await jobs.stop()
+        # не одно и то же: у задачи уже есть кадр корутины, а задание в
+        # очереди - только функция, аргументы и future; корутина
+        # появится, когда задание возьмет воркер
+        print(f"\nidle task (create_task, started coroutine): "
+              f"{per_task.per_object:.0f} B, "
+              f"queued JobQueue job (not started): "
+              f"{per_job.per_object:.0f} B")
+
+    def test_state_objects(self):
+        n = 100_000
+        sizes = {}
+        for name, factory in (("dict", state_dict), ("class", StateClass),
+                              ("slots dataclass", StateSlots)):
+            with Traced(n) as traced:
+                states = [factory(None, None) for _ in range(n)]
+            sizes[name] = traced.per_object
+            del states
+        print("\n" + ", ".join(f"{name}: {size:.0f} B"
+                               for name, size in sizes.items())
+              + f", deque: {Traced.size_of(deque):.0f} B")
+        assert sizes["slots dataclass"] < sizes["class"]
+        assert sizes["slots dataclass"] < sizes["dict"]
+
+    @pytest.mark.asyncio
+    async def test_app_key(self, aiohttp_client):
+        MY_PRIVATE_KEY = AppKey("my_private_key", str)
+
+        async def hello(request):
+            return web.json_response(
+                {"my_private_key": request.app[MY_PRIVATE_KEY]})
+
+        app = web.Application()
+        app[MY_PRIVATE_KEY] = "my_data_value"
+        app["my_private_key"] = "another library"
+        app.add_routes([web.get('/', hello)])
+        client = await aiohttp_client(app)
+        resp = await client.get('/')
+        assert await resp.json() == {"my_private_key": "my_data_value"}
+        assert "my_private_key" in repr(MY_PRIVATE_KEY)
+
+    def test_keepalive_client_connection(self):
+        parent_conn, child_conn = multiprocessing.Pipe()
+        server = multiprocessing.Process(target=serve,
+                                         args=("slow_response", child_conn))
+        server.start()
+        try:
+            assert parent_conn.poll(30)
+            _, port = parent_conn.recv()
+            url = f"http://127.0.0.1:{port}/"
+            parent_conn.send("start")
+
+            async def main() -> float:
+                connector = aiohttp.TCPConnector(limit=0)
+                async with aiohttp.ClientSession(connector=connector) \
+                        as session:
+                    await open_keepalive(session, url, 1)
+                    with Traced(N_CONNECTIONS) as traced:
+                        await open_keepalive(session, url, N_CONNECTIONS + 1)
+                return traced.per_object
+
+            per_connection = asyncio.run(main())
+            parent_conn.send("stop")
+            parent_conn.recv()
+        finally:
+            server.join(10)
+            if server.is_alive():
+                server.kill()
+        print(f"\nkeepalive client connection: {per_connection:.0f} B")
+        assert per_connection > 0
+
+    @pytest.mark.asyncio
+    async def test_server_connection(self, aiohttp_server):
+        server = await aiohttp_server(APPS["slow_response"]())
+        await asyncio.sleep(0)
+
+        parent_conn, child_conn = multiprocessing.Pipe()
+        clients = multiprocessing.Process(
+            target=hold_connections,
+            args=(str(server.make_url('/')), N_CONNECTIONS, child_conn))
+        with Traced(N_CONNECTIONS) as traced:
+            clients.start()
+            assert await asyncio.to_thread(parent_conn.poll, 30)
+            assert parent_conn.recv() == "connected"
+        parent_conn.send("stop")
+        await asyncio.to_thread(clients.join, 10)
+        print(f"\nidle keepalive server connection: "
+              f"{traced.per_object:.0f} B")
+        assert traced.per_object > 0
@@ -0,0 +1,192 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from single_flight import SingleFlightSession
+
+
+class TestSingleFlight:
+
+    async def make_server(self, aiohttp_server, list_request: list[str]):
+        async def handler(request):
+            list_request.append(request.path_qs)
+            await asyncio.sleep(0.05)
+            return web.json_response(dict(request.query))
+
+        async def post_handler(request):
+            list_request.append("post")
+            return web.Response(text="ok")
+
+        async def broken(request):
+            list_request.append("broken")
+            await asyncio.sleep(0.05)
+            return web.Response(status=503)
+
+        app = web.Application()
+        app.add_routes([web.get('/get', handler),
+                        web.post('/post', post_handler),
+                        web.get('/broken', broken)])
+        return await aiohttp_server(app)
+
+    @pytest.mark.asyncio
+    async def test_coalesce_identical_requests(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/get')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session)
+            # порядок параметров не важен
+            params = [{'key1': 'value1', 'key2': 'value2'},
+                      {'key2': 'value2', 'key1': 'value1'}]
+            res = await asyncio.gather(*[
+                single_flight.get(url, params=params[i % 2])
+                for i in range(20)])
+
+        assert list_request == ['/get?key1=value1&key2=value2']
+        assert all(r is res[0] for r in res)
+        assert res[0].status == 200
+        assert res[0].json() == {'key1': 'value1', 'key2': 'value2'}
+        assert single_flight.stats() == {"hits": 0, "coalesced": 19,
+                                         "misses": 1, "bypassed": 0,
+                                         "in_flight": 0}
+
+    @pytest.mark.asyncio
+    async def test_key_headers(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/get')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session)
+            await asyncio.gather(
+                single_flight.get(url, headers={"Authorization": "user_1"}),
+                single_flight.get(url, headers={"Authorization": "user_2"}),
+                single_flight.get(url, headers={"X-Trace": "1"}),
+                single_flight.get(url, headers={"X-Trace": "2"}),
+            )
+        # разные пользователи - разные запросы, X-Trace в ключ не входит
+        assert len(list_request) == 3
+
+    @pytest.mark.asyncio
+    async def test_key_headers_case_insensitive(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/get')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session)
+            res = await asyncio.gather(
+                single_flight.get(url, headers={"authorization": "alice"}),
+                single_flight.get(url, headers={"authorization": "bob"}),
+            )
+        assert len(list_request) == 2
+        assert res[0] is not res[1]
+        assert single_flight.coalesced == 0
+
+    def test_url_credentials_in_key(self):
+        single_flight = SingleFlightSession(None)
+        assert single_flight.make_key("GET", "http://alice:a@h/x") \
+            != single_flight.make_key("GET", "http://bob:b@h/x")
+
+    @pytest.mark.asyncio
+    async def test_cookie_header(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/get')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session, ttl=10)
+            res = await asyncio.gather(
+                single_flight.get(url, headers={"Cookie": "sid=alice"}),
+                single_flight.get(url, headers={"cookie": "sid=bob"}),
+            )
+            assert res[0] is not res[1]
+            assert len(list_request) == 2
+
+            # Cookie убран из ключа - такие запросы идут мимо
+            single_flight = SingleFlightSession(session, ttl=10,
+                                                key_headers=("Accept",))
+            await asyncio.gather(
+                single_flight.get(url, headers={"Cookie": "sid=alice"}),
+                single_flight.get(url, headers={"Cookie": "sid=bob"}),
+            )
+        assert len(list_request) == 4
+        assert single_flight.bypassed == 2
+
+    @pytest.mark.asyncio
+    async def test_other_kwargs_bypassed(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/get')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session, ttl=10)
+            res = await asyncio.gather(
+                single_flight.get(url, auth=aiohttp.BasicAuth("alice")),
+                single_flight.get(url, auth=aiohttp.BasicAuth("bob")),
+            )
+            await single_flight.get(url, auth=aiohttp.BasicAuth("alice"))
+        # auth не входит в ключ, поэтому такие запросы не объединяются
+        assert len(list_request) == 3
+        assert res[0] is not res[1]
+        assert single_flight.bypassed == 3
+
+    @pytest.mark.asyncio
+    async def test_ttl_cache(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/get')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session, ttl=0.2)
+            await single_flight.get(url)
+            await single_flight.get(url)
+            await asyncio.sleep(0.3)
+            await single_flight.get(url)
+
+        assert len(list_request) == 2
+        assert single_flight.hits == 1
+        assert single_flight.misses == 2
+
+    @pytest.mark.asyncio
+    async def test_not_idempotent_bypassed(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/post')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session, ttl=10)
+            res = await asyncio.gather(*[
+                single_flight.request("POST", url, data=b"data")
+                for _ in range(3)])
+
+        assert list_request == ["post"] * 3
+        assert res[0].text() == "ok"
+        assert single_flight.bypassed == 3
+
+    @pytest.mark.asyncio
+    async def test_server_error_not_cached(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/broken')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session, ttl=10)
+            res = await asyncio.gather(*[single_flight.get(url)
+                                         for _ in range(5)])
+            await single_flight.get(url)
+
+        assert all(r.status == 503 for r in res)
+        assert list_request == ["broken"] * 2
+
+    @pytest.mark.asyncio
+    async def test_leader_cancel(self, aiohttp_server):
+        list_request: list[str] = []
+        server = await self.make_server(aiohttp_server, list_request)
+        url = server.make_url('/get')
+        async with aiohttp.ClientSession() as session:
+            single_flight = SingleFlightSession(session)
+            leader = asyncio.create_task(single_flight.get(url))
+            await asyncio.sleep(0)
+            follower = asyncio.create_task(single_flight.get(url))
+            await asyncio.sleep(0)
+            leader.cancel()
+            res = await follower
+
+        assert leader.cancelled()
+        assert res.status == 200
+        assert len(list_request) == 1
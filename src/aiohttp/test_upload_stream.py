@@ -0,0 +1,120 @@
+import hashlib
+import os
+import tracemalloc
+
+import aiohttp
+import pytest
+from aiohttp import web
+from upload_stream import receive_upload
+
+
+class TestUploadStream:
+
+    async def make_client(self, aiohttp_client, **upload_kwargs):
+        list_chunk: list[tuple[str, int]] = []
+
+        async def consumer(name: str, chunk: bytes):
+            list_chunk.append((name, len(chunk)))
+
+        async def upload(request):
+            kwargs = dict(upload_kwargs)
+            if kwargs.pop("use_consumer", False):
+                kwargs["consumer"] = consumer
+            parts = await receive_upload(request, **kwargs)
+            result = []
+            for part in parts:
+                data = {"name": part.name, "filename": part.filename,
+                        "size": part.size, "digest": part.digest}
+                if part.body is not None:
+                    data["in_memory"] = part.body.in_memory
+                    f = part.body.open()
+                    data["head"] = f.read(10).decode("latin-1")
+                    part.body.close()
+                result.append(data)
+            return web.json_response(result)
+
+        app = web.Application()
+        app.add_routes([web.post('/upload', upload)])
+        return await aiohttp_client(app), list_chunk
+
+    @pytest.mark.asyncio
+    async def test_spool_small_and_large(self, aiohttp_client, tmp_path):
+        client, _ = await self.make_client(aiohttp_client,
+                                           spool_threshold=1024 * 1024)
+        big_file = tmp_path / "huge_file.bin"
+        big_data = b"Test str 1" + os.urandom(5 * 1024 * 1024)
+        big_file.write_bytes(big_data)
+
+        form = aiohttp.FormData()
+        form.add_field("comment", "small text field")
+        form.add_field("file", open(big_file, "rb"), filename="huge_file.bin")
+        resp = await client.post('/upload', data=form)
+        assert resp.status == 200
+        comment, file = await resp.json()
+
+        assert comment["size"] == len("small text field")
+        assert comment["in_memory"]
+        assert comment["head"] == "small text"
+        assert file["filename"] == "huge_file.bin"
+        assert file["size"] == len(big_data)
+        assert file["digest"] == hashlib.sha256(big_data).hexdigest()
+        assert not file["in_memory"]
+        assert file["head"] == "Test str 1"
+
+    @pytest.mark.asyncio
+    async def test_part_size_limit(self, aiohttp_client):
+        client, _ = await self.make_client(aiohttp_client, max_part_size=1000)
+        form = aiohttp.FormData()
+        form.add_field("file", b"x" * 5000, filename="data.bin")
+        resp = await client.post('/upload', data=form)
+        assert resp.status == 413
+
+    @pytest.mark.asyncio
+    async def test_total_size_limit(self, aiohttp_client):
+        client, _ = await self.make_client(aiohttp_client,
+                                           max_part_size=1000,
+                                           max_total_size=1500)
+        form = aiohttp.FormData()
+        form.add_field("first", b"x" * 900, filename="first.bin")
+        form.add_field("second", b"x" * 900, filename="second.bin")
+        resp = await client.post('/upload', data=form)
+        assert resp.status == 413
+
+    @pytest.mark.asyncio
+    async def test_consumer(self, aiohttp_client):
+        client, list_chunk = await self.make_client(
+            aiohttp_client, use_consumer=True, chunk_size=1024)
+        form = aiohttp.FormData()
+        form.add_field("file", b"x" * 10_000, filename="data.bin")
+        resp = await client.post('/upload', data=form)
+        [part] = await resp.json()
+
+        assert part["size"] == 10_000
+        assert "in_memory" not in part
+        assert sum(size for _, size in list_chunk) == 10_000
+        assert {name for name, _ in list_chunk} == {"file"}
+
+    @pytest.mark.asyncio
+    async def test_memory_stays_low(self, aiohttp_client, tmp_path):
+        client, _ = await self.make_client(aiohttp_client,
+                                           spool_threshold=256 * 1024)
+        big_file = tmp_path / "huge_file.bin"
+        size = 32 * 1024 * 1024
+        with open(big_file, "wb") as f:
+            for _ in range(size // (1024 * 1024)):
+                f.write(os.urandom(1024 * 1024))
+
+        tracemalloc.start()
+        try:
+            form = aiohttp.FormData()
+            form.add_field("file", open(big_file, "rb"), filename="huge.bin")
+            resp = await client.post('/upload', data=form)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        [part] = await resp.json()
+        assert part["size"] == size
+        # request.post() держал бы в памяти весь файл
+        print(f"\nupload of {size} bytes, peak traced memory {peak} bytes")
+        assert peak < size // 4
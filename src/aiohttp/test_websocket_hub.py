@@ -0,0 +1,204 @@
+import asyncio
+import multiprocessing
+import os
+import time
+import tracemalloc
+from multiprocessing.connection import Connection
+
+import aiohttp
+import orjson
+import pytest
+from aiohttp import WSCloseCode, WSMsgType, web
+from metrics import Histogram
+from websocket_hub import WebSocketHub
+
+# полный прогон: WS_HUB_CONNECTIONS=10000 python -m pytest ... -k load
+LOAD_CONNECTIONS = int(os.environ.get("WS_HUB_CONNECTIONS", 200))
+LOAD_MESSAGES = 20
+
+
+async def wait_subscribers(hub: WebSocketHub, n: int):
+    while len(hub) < n:
+        await asyncio.sleep(0.01)
+
+
+class TestWebSocketHub:
+
+    async def make_client(self, aiohttp_client, hub: WebSocketHub):
+        app = web.Application()
+        app.add_routes([web.get('/ws', hub.handler)])
+        app.on_shutdown.append(hub.on_shutdown)
+        return await aiohttp_client(app)
+
+    @pytest.mark.asyncio
+    async def test_broadcast(self, aiohttp_client):
+        calls = 0
+
+        def dumps(message):
+            nonlocal calls
+            calls += 1
+            return orjson.dumps(message)
+
+        hub = WebSocketHub(dumps=dumps)
+        client = await self.make_client(aiohttp_client, hub)
+        sockets = [await client.ws_connect('/ws') for _ in range(5)]
+        await wait_subscribers(hub, 5)
+
+        hub.publish({"seq": 1})
+        hub.publish({"seq": 2})
+        for ws in sockets:
+            assert (await ws.receive()).json() == {"seq": 1}
+            assert (await ws.receive()).json() == {"seq": 2}
+        # одна сериализация на сообщение, один проход по подписчикам
+        assert calls == 2
+        assert hub.fanout_time.count == 1
+
+        await sockets[0].close()
+        while len(hub) > 4:
+            await asyncio.sleep(0.01)
+        assert hub.stats()["published"] == 2
+
+    @pytest.mark.asyncio
+    async def test_frames(self, aiohttp_client):
+        hub = WebSocketHub()
+        client = await self.make_client(aiohttp_client, hub)
+        ws = await client.ws_connect('/ws')
+        await wait_subscribers(hub, 1)
+
+        for size in (10, 1000, 100_000):
+            hub.publish("x" * size)
+            msg = await ws.receive()
+            assert msg.type == WSMsgType.TEXT and msg.data == "x" * size
+        hub.publish(b"\x00\x01")
+        msg = await ws.receive()
+        assert msg.type == WSMsgType.BINARY and msg.data == b"\x00\x01"
+
+        await client.server.close()
+        msg = await ws.receive()
+        assert msg.type == WSMsgType.CLOSE
+        assert msg.data == WSCloseCode.GOING_AWAY
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest(self, aiohttp_client):
+        # high_water=-1: любой клиент считается медленным
+        hub = WebSocketHub(queue_size=2, high_water=-1)
+        client = await self.make_client(aiohttp_client, hub)
+        ws = await client.ws_connect('/ws')
+        await wait_subscribers(hub, 1)
+
+        for seq in range(5):
+            hub.publish({"seq": seq})
+        assert [(await ws.receive()).json()["seq"] for _ in range(2)] == [3, 4]
+        assert hub.dropped == 3
+
+    @pytest.mark.asyncio
+    async def test_disconnect_slow(self, aiohttp_client):
+        hub = WebSocketHub(queue_size=2, high_water=-1,
+                           on_overflow="disconnect")
+        client = await self.make_client(aiohttp_client, hub)
+        ws = await client.ws_connect('/ws')
+        await wait_subscribers(hub, 1)
+
+        for seq in range(5):
+            hub.publish({"seq": seq})
+        msg = await ws.receive()
+        assert msg.type == WSMsgType.CLOSE
+        assert msg.data == WSCloseCode.TRY_AGAIN_LATER
+        assert hub.disconnected == 1 and len(hub) == 0
+
+    def test_load(self):
+        # сервер в отдельном процессе: и его память меряется отдельно,
+        # и 2 * 10k сокетов не упираются в лимит файлов одного процесса
+        parent_conn, child_conn = multiprocessing.Pipe()
+        server = multiprocessing.Process(target=serve_hub, args=(child_conn,))
+        server.start()
+        try:
+            assert parent_conn.poll(30)
+            port = parent_conn.recv()
+            result = asyncio.run(run_clients(
+                f"http://127.0.0.1:{port}/ws", parent_conn))
+        finally:
+            server.join(10)
+            if server.is_alive():
+                server.kill()
+
+        latency: Histogram = result["latency"]
+        fanout: Histogram = result["fanout"]
+        assert latency.count == LOAD_CONNECTIONS * LOAD_MESSAGES
+        print(f"\n{LOAD_CONNECTIONS} connections: "
+              f"{result['bytes_per_connection'] / 1024:.1f} KiB/connection "
+              f"on the server; delivery latency p50 "
+              f"{latency.percentile(50) * 1000:.1f}ms p99 "
+              f"{latency.percentile(99) * 1000:.1f}ms; until the last "
+              f"client p50 {fanout.percentile(50) * 1000:.1f}ms max "
+              f"{fanout.max * 1000:.1f}ms; server fan-out pass mean "
+              f"{result['fanout_time']['mean'] * 1000:.2f}ms")
+
+
+async def run_clients(url: str, conn: Connection) -> dict:
+    # замкнутый цикл: следующее сообщение публикуется, когда предыдущее
+    # получили все клиенты, иначе замер упирается в разбор на клиентах
+    latency = Histogram()
+    fanout = Histogram()
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # очередь accept на сервере ограничена, поэтому подключаемся пачками
+        connecting = asyncio.Semaphore(100)
+
+        async def connect():
+            async with connecting:
+                return await session.ws_connect(url, autoping=False)
+
+        sockets = await asyncio.gather(
+            *[connect() for _ in range(LOAD_CONNECTIONS)])
+        conn.send(("connected", LOAD_CONNECTIONS))
+        bytes_per_connection = await asyncio.to_thread(conn.recv)
+
+        async def receive(ws) -> float:
+            msg = await ws.receive()
+            delivered = time.monotonic() - msg.json()["t"]
+            latency.record(delivered)
+            return delivered
+
+        for _ in range(LOAD_MESSAGES):
+            receivers = asyncio.gather(*[receive(ws) for ws in sockets])
+            conn.send(("publish", None))
+            fanout.record(max(await receivers))
+        conn.send(("stop", None))
+        stats = await asyncio.to_thread(conn.recv)
+        await asyncio.gather(*[ws.close() for ws in sockets])
+    return {"latency": latency, "fanout": fanout,
+            "bytes_per_connection": bytes_per_connection,
+            "fanout_time": stats["fanout_time"]}
+
+
+def serve_hub(conn: Connection):
+    async def main():
+        hub = WebSocketHub()
+        app = web.Application()
+        app.add_routes([web.get('/ws', hub.handler)])
+        app.on_shutdown.append(hub.on_shutdown)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0, backlog=1024)
+        await site.start()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        conn.send(runner.addresses[0][1])
+
+        while True:
+            command, arg = await asyncio.to_thread(conn.recv)
+            if command == "connected":
+                await wait_subscribers(hub, arg)
+                used = tracemalloc.get_traced_memory()[0] - baseline
+                tracemalloc.stop()
+                conn.send(used / arg)
+            elif command == "publish":
+                # monotonic в Linux общий для всех процессов
+                hub.publish({"t": time.monotonic()})
+            else:
+                conn.send(hub.stats())
+                break
+        await runner.cleanup()
+
+    asyncio.run(main())
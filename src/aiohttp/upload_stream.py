@@ -0,0 +1,114 @@
+import asyncio
+import functools
+import hashlib
+import io
+import tempfile
+from dataclasses import dataclass, field
+from typing import Awaitable, BinaryIO, Callable
+
+from aiohttp import BodyPartReader, web
+
+# consumer(part_name, chunk) получает тело части по кускам вместо спулинга
+Consumer = Callable[[str | None, bytes], Awaitable[None]]
+
+
+class SpooledBody:
+    """Keeps the body in memory up to `threshold` bytes, then moves it to an
+    anonymous temp file; disk writes go through the default executor."""
+
+    def __init__(self, threshold: int, directory: str | None = None):
+        self.threshold = threshold
+        self.directory = directory
+        self._memory = bytearray()
+        self._file: BinaryIO | None = None
+
+    @property
+    def in_memory(self) -> bool:
+        return self._file is None
+
+    async def write(self, chunk: bytes):
+        loop = asyncio.get_running_loop()
+        if self._file is None:
+            if len(self._memory) + len(chunk) <= self.threshold:
+                self._memory += chunk
+                return
+            self._file = await loop.run_in_executor(
+                None, functools.partial(tempfile.TemporaryFile,
+                                        dir=self.directory))
+            chunk = bytes(self._memory) + chunk
+            self._memory = bytearray()
+        await loop.run_in_executor(None, self._file.write, chunk)
+
+    def open(self) -> BinaryIO:
+        if self._file is None:
+            return io.BytesIO(self._memory)
+        self._file.seek(0)
+        return self._file
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+@dataclass(slots=True)
+class UploadedPart:
+    name: str | None
+    filename: str | None
+    content_type: str | None
+    size: int = 0
+    digest: str = ""
+    # None, если тело отдано consumer
+    body: SpooledBody | None = field(default=None, repr=False)
+
+
+async def receive_upload(request: web.Request, *,
+                         max_part_size: int = 100 * 1024 * 1024,
+                         max_total_size: int = 1024 * 1024 * 1024,
+                         spool_threshold: int = 1024 * 1024,
+                         spool_dir: str | None = None,
+                         consumer: Consumer | None = None,
+                         chunk_size: int = 64 * 1024,
+                         hash_name: str = "sha256") -> list[UploadedPart]:
+    """Streaming replacement for `await request.post()`: reads the parts of
+    a multipart body chunk by chunk, hashing each one, and either spools it
+    (memory up to `spool_threshold`, then a temp file) or hands the chunks
+    to `consumer`. Exceeding a limit raises 413 Request Entity Too Large.
+    """
+    if (request.content_length is not None
+            and request.content_length > max_total_size):
+        raise web.HTTPRequestEntityTooLarge(max_total_size,
+                                            request.content_length)
+
+    parts: list[UploadedPart] = []
+    total = 0
+    reader = await request.multipart()
+    try:
+        while (part := await reader.next()) is not None:
+            if not isinstance(part, BodyPartReader):
+                raise web.HTTPBadRequest(text="nested multipart is not supported")
+            uploaded = UploadedPart(part.name, part.filename,
+                                    part.headers.get("Content-Type"))
+            if consumer is None:
+                uploaded.body = SpooledBody(spool_threshold, spool_dir)
+            parts.append(uploaded)
+            digest = hashlib.new(hash_name)
+            while chunk := await part.read_chunk(chunk_size):
+                uploaded.size += len(chunk)
+                total += len(chunk)
+                if uploaded.size > max_part_size:
+                    raise web.HTTPRequestEntityTooLarge(max_part_size,
+                                                        uploaded.size)
+                if total > max_total_size:
+                    raise web.HTTPRequestEntityTooLarge(max_total_size, total)
+                digest.update(chunk)
+                if consumer is None:
+                    await uploaded.body.write(chunk)
+                else:
+                    await consumer(part.name, chunk)
+            uploaded.digest = digest.hexdigest()
+    except BaseException:
+        for uploaded in parts:
+            if uploaded.body is not None:
+                uploaded.body.close()
+        raise
+    return parts
@@ -0,0 +1,195 @@
+import asyncio
+import struct
+from collections import deque
+from typing import Any, Callable
+
+import orjson
+from aiohttp import WSCloseCode, WSMsgType, web
+from metrics import Histogram
+
+
+def build_frame(payload: bytes, opcode: int = WSMsgType.TEXT) -> bytes:
+    # серверные кадры не маскируются, поэтому кадр одинаков для всех
+    # подключений и собирается один раз
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+class _Subscriber:
+    __slots__ = ("ws", "request", "queue", "writing", "closing")
+
+    def __init__(self, ws: web.WebSocketResponse, request: web.Request):
+        self.ws = ws
+        self.request = request
+        # deque (~770 байт) нужен только медленным клиентам
+        self.queue: deque[bytes] | None = None
+        self.writing = False
+        self.closing: asyncio.Task | None = None
+
+
+class WebSocketHub:
+    """Broadcasts messages to every websocket connected to `handler`.
+
+        hub = WebSocketHub()
+        app.add_routes([web.get('/ws', hub.handler)])
+        app.on_shutdown.append(hub.on_shutdown)
+        hub.publish({"event": "update"})
+
+    A message is serialized with `dumps` and framed once; the same frame
+    bytes go to every connection (str and `dumps` output as text frames,
+    bytes as binary). Messages published during one loop iteration are
+    fanned out in one pass on the next iteration, with a single
+    transport.write() per connection.
+
+    A connection whose transport buffer is over `high_water` bytes gets
+    its frames queued instead (at most `queue_size` messages) and a writer
+    task that drains them. When a slow client's queue is full,
+    on_overflow="drop" discards its oldest messages and "disconnect" closes
+    the connection with 1013 (try again later).
+    """
+
+    def __init__(self, *, queue_size: int = 100, on_overflow: str = "drop",
+                 high_water: int = 64 * 1024,
+                 dumps: Callable[[Any], bytes] = orjson.dumps):
+        if on_overflow not in ("drop", "disconnect"):
+            raise ValueError(f"unknown on_overflow policy {on_overflow!r}")
+        self.queue_size = queue_size
+        self.on_overflow = on_overflow
+        self.high_water = high_water
+        self._dumps = dumps
+        self._subscribers: set[_Subscriber] = set()
+        self._pending: list[bytes] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self._running: set[asyncio.Task] = set()
+        self.published = 0
+        self.dropped = 0
+        self.disconnected = 0
+        self.fanout_time = Histogram()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    async def handler(self, request: web.Request) -> web.WebSocketResponse:
+        # кадры пишутся в транспорт готовыми, permessage-deflate им мешает
+        ws = web.WebSocketResponse(compress=False)
+        await ws.prepare(request)
+        subscriber = _Subscriber(ws, request)
+        self._subscribers.add(subscriber)
+        try:
+            # входящие сообщения не нужны, но читать надо: так
+            # обрабатываются ping/close от клиента
+            async for msg in ws:
+                if msg.type == WSMsgType.ERROR:
+                    break
+        finally:
+            self._subscribers.discard(subscriber)
+        if subscriber.closing is not None:
+            # иначе обработчик вернется раньше и aiohttp закроет сокет
+            # с кодом 1000 вместо нашего
+            await subscriber.closing
+        return ws
+
+    def publish(self, message: Any) -> None:
+        if isinstance(message, bytes):
+            frame = build_frame(message, WSMsgType.BINARY)
+        elif isinstance(message, str):
+            frame = build_frame(message.encode())
+        else:
+            frame = build_frame(self._dumps(message))
+        self._pending.append(frame)
+        self.published += 1
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_soon(
+                self._flush)
+
+    def _flush(self) -> None:
+        self._flush_handle = None
+        batch, self._pending = self._pending, []
+        joined = b"".join(batch)
+        loop = asyncio.get_running_loop()
+        time_start = loop.time()
+        for subscriber in tuple(self._subscribers):
+            transport = subscriber.request.transport
+            if subscriber.ws.closed or transport is None \
+                    or transport.is_closing():
+                self._subscribers.discard(subscriber)
+                continue
+            if not subscriber.writing \
+                    and transport.get_write_buffer_size() <= self.high_water:
+                transport.write(joined)
+                continue
+
+            # медленный клиент: копим кадры в его очереди
+            queue = subscriber.queue
+            if queue is None:
+                queue = subscriber.queue = deque()
+            queue.extend(batch)
+            overflow = len(queue) - self.queue_size
+            if overflow > 0:
+                if self.on_overflow == "disconnect":
+                    self._disconnect(subscriber)
+                    continue
+                self.dropped += overflow
+                for _ in range(overflow):
+                    queue.popleft()
+            if not subscriber.writing:
+                subscriber.writing = True
+                self._spawn(self._write(subscriber))
+        self.fanout_time.record(loop.time() - time_start)
+
+    async def _write(self, subscriber: _Subscriber) -> None:
+        queue, request = subscriber.queue, subscriber.request
+        try:
+            while queue and subscriber.closing is None:
+                transport = request.transport
+                if transport is None or transport.is_closing():
+                    break
+                frames = b"".join(queue)
+                queue.clear()
+                transport.write(frames)
+                await request.writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            queue.clear()
+            subscriber.queue = None
+            subscriber.writing = False
+
+    def _disconnect(self, subscriber: _Subscriber) -> None:
+        self.disconnected += 1
+        self._close(subscriber, WSCloseCode.TRY_AGAIN_LATER,
+                    b"send queue overflow")
+
+    def _close(self, subscriber: _Subscriber, code: int,
+               message: bytes = b"") -> asyncio.Task:
+        self._subscribers.discard(subscriber)
+        if subscriber.queue is not None:
+            subscriber.queue.clear()
+        if subscriber.closing is None:
+            subscriber.closing = self._spawn(
+                subscriber.ws.close(code=code, message=message))
+        return subscriber.closing
+
+    def _spawn(self, coro) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        return task
+
+    async def on_shutdown(self, app: web.Application) -> None:
+        await asyncio.gather(*[self._close(s, WSCloseCode.GOING_AWAY)
+                               for s in tuple(self._subscribers)],
+                             return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped": self.dropped,
+                "disconnected": self.disconnected,
+                "fanout_time": self.fanout_time.snapshot()}
@@ -0,0 +1,108 @@
+import asyncio
+import os
+from concurrent.futures import Executor
+
+
+def read_batch(fd: int, buffers: list[memoryview], offset: int,
+               seekable: bool) -> int:
+    # один системный вызов заполняет сразу несколько буферов
+    if seekable:
+        return os.preadv(fd, buffers, offset)
+    return os.readv(fd, buffers)
+
+
+class AsyncFileReader:
+    """Chunked async file reader without per-chunk thread hops.
+
+    One executor submission fills `batch` chunks with a single os.preadv
+    into a pre-allocated ring of 2 * batch buffers: while the caller consumes
+    one half of the ring, the next batch is read into the other half.
+    For big chunks the batch is cut so one half stays within `batch_bytes`.
+
+    Yielded memoryviews point into the ring and are only valid until the next
+    iteration step - copy them with bytes() to keep the data.
+    """
+
+    def __init__(self, path: str | os.PathLike, chunk_size: int = 64 * 1024,
+                 *, batch: int = 4, batch_bytes: int = 1024 * 1024,
+                 size: int | None = None, executor: Executor | None = None):
+        if chunk_size <= 0 or batch <= 0:
+            raise ValueError("chunk_size and batch must be greater than 0")
+        self.path = path
+        self.chunk_size = chunk_size
+        self.batch = max(1, min(batch, batch_bytes // chunk_size))
+        self.size = size
+        self.executor = executor
+        self.submissions = 0
+        self._ring = [bytearray(chunk_size) for _ in range(2 * self.batch)]
+
+    def _buffers(self, half: int, remaining: int | None) -> list[memoryview]:
+        buffers = []
+        for buf in self._ring[half * self.batch:(half + 1) * self.batch]:
+            view = memoryview(buf)
+            if remaining is not None:
+                if remaining <= 0:
+                    break
+                view = view[:remaining]
+                remaining -= len(view)
+            buffers.append(view)
+        return buffers
+
+    def __aiter__(self):
+        return self._iter_chunks()
+
+    async def _iter_chunks(self):
+        loop = asyncio.get_running_loop()
+        fd = await loop.run_in_executor(self.executor, os.open,
+                                        self.path, os.O_RDONLY)
+        pending: asyncio.Future | None = None
+        try:
+            try:
+                os.lseek(fd, 0, os.SEEK_CUR)
+                seekable = True
+            except OSError:
+                seekable = False
+            offset = 0
+            remaining = self.size
+            half = 0
+
+            def submit(buffers):
+                self.submissions += 1
+                return loop.run_in_executor(self.executor, read_batch,
+                                            fd, buffers, offset, seekable)
+
+            buffers = self._buffers(half, remaining)
+            pending = submit(buffers) if buffers else None
+            while pending is not None:
+                n = await pending
+                pending = None
+                offset += n
+                if remaining is not None:
+                    remaining -= n
+                current = buffers
+                half ^= 1
+                if n > 0:
+                    # читаем следующую пачку, пока вызывающий
+                    # разбирает текущую; неполное чтение (pipe, FIFO) -
+                    # еще не конец файла, конец - только n == 0
+                    buffers = self._buffers(half, remaining)
+                    if buffers:
+                        pending = submit(buffers)
+                for view in current:
+                    if n <= 0:
+                        break
+                    chunk = view[:n] if n < len(view) else view
+                    n -= len(chunk)
+                    yield chunk
+        finally:
+            if pending is not None:
+                # поток еще пишет в буферы - дожидаемся его до закрытия fd
+                await asyncio.wait([pending])
+            os.close(fd)
+
+
+async def read_file(path: str | os.PathLike, size: int | None = None, *,
+                    chunk_size: int = 64 * 1024,
+                    executor: Executor | None = None) -> bytes:
+    reader = AsyncFileReader(path, chunk_size, size=size, executor=executor)
+    return b"".join([bytes(chunk) async for chunk in reader])
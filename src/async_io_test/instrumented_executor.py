@@ -0,0 +1,270 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import time
+import weakref
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, thread
+
+from metrics import Histogram
+
+
+def callable_name(fn) -> str:
+    # asyncio.to_thread передает functools.partial(ctx.run, func, ...),
+    # поэтому разворачиваем partial и Context.run до настоящей функции
+    while isinstance(fn, functools.partial):
+        if isinstance(getattr(fn.func, "__self__", None), contextvars.Context):
+            fn = fn.args[0]
+        else:
+            fn = fn.func
+    return getattr(fn, "__qualname__", None) or repr(fn)
+
+
+class _Retire:
+    # метка в очереди: ее берет свободный поток и завершается.
+    # future нужен shutdown(cancel_futures=True) - он отменяет все в очереди
+    __slots__ = ("future",)
+
+    def __init__(self):
+        self.future = Future()
+
+
+class _RetiringQueue:
+    # очередь одного потока поверх общей: на _Retire отдает None, а ссылка
+    # на пул для этого потока становится None - стандартный _worker
+    # считает пул закрытым и выходит, не будя остальных
+    def __init__(self, work_queue):
+        self.work_queue = work_queue
+        self.retired = False
+
+    def get(self, block=True):
+        work_item = self.work_queue.get(block=block)
+        if isinstance(work_item, _Retire):
+            self.retired = True
+            return None
+        return work_item
+
+    def put(self, item):
+        if not self.retired:
+            self.work_queue.put(item)
+
+
+def _worker(executor_reference, work_queue, initializer, initargs):
+    queue = _RetiringQueue(work_queue)
+    thread._worker(lambda: None if queue.retired else executor_reference(),
+                   queue, initializer, initargs)
+    executor = executor_reference()
+    if queue.retired and executor is not None:
+        executor._retired(threading.current_thread())
+
+
+class InstrumentedThreadPoolExecutor(ThreadPoolExecutor):
+    """ThreadPoolExecutor that tracks queue depth, active workers and
+    wait / run time per call, and can resize itself on wait time.
+
+    With `autoscale_max_workers` a call that waited longer than
+    `target_wait` adds a worker (up to that limit); after `shrink_after`
+    calls in a row that waited less, one worker is removed again (down to
+    `max_workers`) and a surplus idle thread exits.
+    """
+
+    def __init__(self, max_workers: int | None = None,
+                 thread_name_prefix: str = "", *,
+                 autoscale_max_workers: int | None = None,
+                 target_wait: float = 0.05, shrink_after: int = 100):
+        super().__init__(max_workers=max_workers,
+                         thread_name_prefix=thread_name_prefix)
+        self.min_workers = self._max_workers
+        self.autoscale_max_workers = autoscale_max_workers
+        self.target_wait = target_wait
+        self.shrink_after = shrink_after
+        self._fast_calls = 0
+        self._retiring = 0
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.wait_time = Histogram()
+        self.run_time = Histogram()
+        self.per_callable: dict[str, Histogram] = defaultdict(Histogram)
+        self._stats_lock = threading.Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def threads(self) -> int:
+        return len(self._threads)
+
+    def resize(self, max_workers: int):
+        # при уменьшении лишние потоки завершаются, как только освободятся
+        if max_workers <= 0:
+            raise ValueError("max_workers must be greater than 0")
+        with self._stats_lock:
+            self._max_workers = max_workers
+        self._spawn_workers()
+        self._retire_surplus()
+
+    def _adjust_thread_count(self):
+        # ThreadPoolExecutor._adjust_thread_count, но потоки идут через
+        # _worker, который умеет завершать лишний поток
+        if self._idle_semaphore.acquire(timeout=0):
+            return
+
+        def weakref_cb(_, q=self._work_queue):
+            q.put(None)
+
+        num_threads = len(self._threads)
+        if num_threads < self._max_workers:
+            thread_name = '%s_%d' % (self._thread_name_prefix or self,
+                                     num_threads)
+            t = threading.Thread(name=thread_name, target=_worker,
+                                 args=(weakref.ref(self, weakref_cb),
+                                       self._work_queue,
+                                       self._initializer,
+                                       self._initargs))
+            t.start()
+            self._threads.add(t)
+            thread._threads_queues[t] = self._work_queue
+
+    def _retire_surplus(self):
+        with self._shutdown_lock:
+            while (not self._shutdown and len(self._threads) - self._retiring
+                   > self._max_workers):
+                self._retiring += 1
+                self._work_queue.put(_Retire())
+
+    def _retired(self, t: threading.Thread):
+        # поток был свободен: его место в _idle_semaphore больше не занято
+        self._idle_semaphore.acquire(timeout=0)
+        with self._shutdown_lock:
+            self._retiring -= 1
+            # shutdown() обходит _threads без блокировки - после него не трогаем
+            if not self._shutdown:
+                self._threads.discard(t)
+
+    def _spawn_workers(self):
+        # стартуем недостающие потоки сразу, не дожидаясь следующего submit.
+        # _idle_semaphore отпускается после каждой задачи и завышает число
+        # свободных потоков; раз задачи стоят в очереди - свободных нет.
+        with self._shutdown_lock:
+            while (not self._shutdown and self.queued > 0
+                   and len(self._threads) < min(self._max_workers,
+                                                self.active + self.queued)):
+                while self._idle_semaphore.acquire(timeout=0):
+                    pass
+                self._adjust_thread_count()
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        name = callable_name(fn)
+        submitted = time.perf_counter()
+        with self._stats_lock:
+            self.queued += 1
+
+        def run():
+            started = time.perf_counter()
+            with self._stats_lock:
+                self.queued -= 1
+                self.active += 1
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(name, started - submitted,
+                             time.perf_counter() - started)
+
+        try:
+            future = super().submit(run)
+        except BaseException:
+            # после shutdown задача в очередь не попала
+            with self._stats_lock:
+                self.queued -= 1
+            raise
+        future.add_done_callback(self._on_done)
+        return future
+
+    def _on_done(self, future: Future):
+        # отмененная до старта задача (cancel, shutdown(cancel_futures=True))
+        # так и не дошла до run(), из очереди ее надо убрать здесь
+        if future.cancelled():
+            with self._stats_lock:
+                self.queued -= 1
+
+    def _record(self, name: str, wait: float, run: float):
+        grown = shrunk = False
+        with self._stats_lock:
+            self.active -= 1
+            self.completed += 1
+            self.wait_time.record(wait)
+            self.run_time.record(run)
+            self.per_callable[name].record(run)
+            if self.autoscale_max_workers is not None:
+                if wait > self.target_wait:
+                    self._fast_calls = 0
+                    if self._max_workers < self.autoscale_max_workers:
+                        self._max_workers += 1
+                        grown = True
+                else:
+                    self._fast_calls += 1
+                    if (self._fast_calls >= self.shrink_after
+                            and self._max_workers > self.min_workers):
+                        self._fast_calls = 0
+                        self._max_workers -= 1
+                        shrunk = True
+        if grown:
+            self._spawn_workers()
+        if shrunk:
+            self._retire_surplus()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "max_workers": self._max_workers,
+                "threads": len(self._threads),
+                "queue_depth": self.queued,
+                "active_workers": self.active,
+                "completed": self.completed,
+                "wait_time": self.wait_time.snapshot(),
+                "run_time": self.run_time.snapshot(),
+                "per_callable": {name: hist.snapshot()
+                                 for name, hist in self.per_callable.items()},
+            }
+
+
+class ExecutorPools:
+    """Named thread pools (file I/O, DNS, crypto...) so one kind of blocking
+    work cannot starve another. One of them is installed as loop default."""
+
+    def __init__(self, sizes: dict[str, int], default: str = "default",
+                 **executor_kwargs):
+        if default not in sizes:
+            raise ValueError(f"default pool {default!r} is not in sizes")
+        self.default = default
+        self.pools: dict[str, InstrumentedThreadPoolExecutor] = {
+            name: InstrumentedThreadPoolExecutor(
+                size, thread_name_prefix=f"pool-{name}", **executor_kwargs)
+            for name, size in sizes.items()
+        }
+
+    def __getitem__(self, name: str) -> InstrumentedThreadPoolExecutor:
+        return self.pools[name]
+
+    def install(self, loop: asyncio.AbstractEventLoop | None = None):
+        # after this asyncio.to_thread, loop.run_in_executor(None, ...)
+        # and aiofiles (executor=None) all go through the default pool
+        loop = loop or asyncio.get_running_loop()
+        loop.set_default_executor(self.pools[self.default])
+
+    async def run(self, pool: str, func, /, *args, **kwargs):
+        # то же, что asyncio.to_thread, но в выбранном пуле
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        func_call = functools.partial(ctx.run, func, *args, **kwargs)
+        return await loop.run_in_executor(self.pools[pool], func_call)
+
+    def stats(self) -> dict[str, dict]:
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def shutdown(self, wait: bool = True):
+        for pool in self.pools.values():
+            pool.shutdown(wait=wait)
@@ -0,0 +1,59 @@
+import bisect
+
+
+class Histogram:
+    """Fixed-bucket histogram: constant memory and O(log n) record,
+    cheap enough to leave on in production."""
+
+    __slots__ = ("bounds", "counts", "count", "total", "min", "max")
+
+    def __init__(self, bounds: list[float] | None = None):
+        # по умолчанию - секунды, от 1 мкс до ~134 с, шаг x2
+        self.bounds: list[float] = bounds or self.exponential(1e-6, 2, 28)
+        self.counts: list[int] = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    @staticmethod
+    def exponential(start: float, factor: float, n: int) -> list[float]:
+        return [start * factor ** i for i in range(n)]
+
+    def record(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        # upper bound of the bucket holding the q-th value, clamped to max
+        if not self.count:
+            return 0.0
+        rank = q / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                if i == len(self.bounds):
+                    return self.max
+                return min(self.bounds[i], self.max)
+        return self.max
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "min": self.min if self.count else 0.0,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+        }
@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from metrics import Histogram
+
+BatchFn = Callable[[list[Any]], Awaitable[list[Any]]]
+
+
+class MicroBatcher:
+    """Like asyncio.Barrier, but for work: concurrent callers submit items,
+    and a batch is flushed at `max_size` items or `max_delay` seconds after
+    its first item, whichever comes first. One `batch_fn(items)` call
+    (a bulk insert, a model call...) serves the whole batch and must return
+    one result per item, in order; each result goes back to its caller.
+
+    A caller cancelled before the flush is left out of the batch; one
+    cancelled after the flush just doesn't get the result.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_size: int = 100,
+                 max_delay: float = 0.01):
+        if max_size <= 0:
+            raise ValueError("max_size must be greater than 0")
+        self.batch_fn = batch_fn
+        self.max_size = max_size
+        self.max_delay = max_delay
+        self.batch_size = Histogram(Histogram.exponential(1, 2, 16))
+        self.batch_time = Histogram()
+        self.latency = Histogram()
+        self._pending: list[tuple[Any, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+
+    async def submit(self, item: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._pending.append((item, fut))
+        if len(self._pending) >= self.max_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self.flush)
+
+        started = loop.time()
+        try:
+            return await fut
+        finally:
+            self.latency.record(loop.time() - started)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch = [(item, fut) for item, fut in self._pending
+                 if not fut.cancelled()]
+        self._pending = []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[Any, asyncio.Future]]):
+        self.batch_size.record(len(batch))
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            results = await self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"batch_fn returned {len(results)} results "
+                                 f"for {len(batch)} items")
+        except asyncio.CancelledError:
+            for _, fut in batch:
+                fut.cancel()
+            raise
+        except Exception as exc:
+            for _, fut in batch:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        finally:
+            self.batch_time.record(loop.time() - started)
+
+        for (_, fut), result in zip(batch, results):
+            if not fut.done():
+                fut.set_result(result)
+
+    async def close(self):
+        # отправить накопленное и дождаться запущенных пачек
+        self.flush()
+        if self._running:
+            await asyncio.wait(self._running)
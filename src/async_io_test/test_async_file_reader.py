@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+
+import aiofiles
+import pytest
+from async_file_reader import AsyncFileReader, read_file
+from instrumented_executor import InstrumentedThreadPoolExecutor
+
+
+class TestAsyncFileReader:
+
+    @pytest.mark.asyncio
+    async def test_read_urandom(self):
+        # аналог blocking_io из test_thread_and_proccess, одна пачка - один поток
+        result = await read_file('/dev/urandom', 100)
+        assert isinstance(result, bytes)
+        assert len(result) == 100
+
+    @pytest.mark.asyncio
+    async def test_chunks_are_memoryview(self, tmp_path):
+        data = os.urandom(10 * 1000 + 17)
+        temp_file = tmp_path / "data.bin"
+        temp_file.write_bytes(data)
+
+        reader = AsyncFileReader(temp_file, 1000, batch=3)
+        list_chunk: list[bytes] = []
+        async for chunk in reader:
+            assert isinstance(chunk, memoryview)
+            list_chunk.append(bytes(chunk))
+
+        assert b"".join(list_chunk) == data
+        assert [len(c) for c in list_chunk] == [1000] * 10 + [17]
+        # 11 чанков за 4 обращения к пулу потоков (плюс открытие файла)
+        # и одно пустое чтение: конец файла - только n == 0
+        assert reader.submissions == 5
+
+    @pytest.mark.asyncio
+    async def test_size_limit(self, tmp_path):
+        temp_file = tmp_path / "data.bin"
+        temp_file.write_bytes(b"0123456789" * 10)
+        assert await read_file(temp_file, 25, chunk_size=10) == \
+            b"0123456789" * 2 + b"01234"
+        assert await read_file(temp_file) == b"0123456789" * 10
+
+    @pytest.mark.asyncio
+    async def test_empty_file(self, tmp_path):
+        temp_file = tmp_path / "empty.bin"
+        temp_file.write_bytes(b"")
+        assert await read_file(temp_file) == b""
+
+    @pytest.mark.asyncio
+    async def test_fifo_short_reads(self, tmp_path):
+        fifo = tmp_path / "fifo"
+        os.mkfifo(fifo)
+
+        def writer():
+            # каждая запись - отдельное неполное чтение на стороне читателя
+            with open(fifo, "wb", buffering=0) as f:
+                for part in (b"a" * 10, b"b" * 10):
+                    f.write(part)
+                    time.sleep(0.05)
+
+        write_task = asyncio.create_task(asyncio.to_thread(writer))
+        assert await read_file(fifo) == b"a" * 10 + b"b" * 10
+        await write_task
+
+    @pytest.mark.asyncio
+    async def test_break_closes_file(self, tmp_path):
+        temp_file = tmp_path / "data.bin"
+        temp_file.write_bytes(b"x" * 100_000)
+        fd_before = len(os.listdir('/proc/self/fd'))
+        reader = AsyncFileReader(temp_file, 1000)
+        chunks = aiter(reader)
+        async for chunk in chunks:
+            break
+        await chunks.aclose()
+        assert len(os.listdir('/proc/self/fd')) == fd_before
+
+    @pytest.mark.asyncio
+    async def test_benchmark_vs_aiofiles(self, tmp_path):
+        temp_file = tmp_path / "bench.bin"
+        temp_file.write_bytes(os.urandom(16 * 1024 * 1024))
+
+        for chunk_size in (4 * 1024, 64 * 1024, 1024 * 1024, 4 * 1024 * 1024):
+            executor = InstrumentedThreadPoolExecutor(4)
+            time_start = time.perf_counter()
+            total = 0
+            async with aiofiles.open(temp_file, 'rb', executor=executor) as f:
+                chunk = await f.read(chunk_size)
+                while chunk:
+                    total += len(chunk)
+                    chunk = await f.read(chunk_size)
+            aiofiles_time = time.perf_counter() - time_start
+            aiofiles_hops = executor.completed
+            executor.shutdown()
+
+            executor = InstrumentedThreadPoolExecutor(4)
+            time_start = time.perf_counter()
+            total_reader = 0
+            async for chunk in AsyncFileReader(temp_file, chunk_size,
+                                               batch=8, executor=executor):
+                total_reader += len(chunk)
+            reader_time = time.perf_counter() - time_start
+            reader_hops = executor.completed
+            executor.shutdown()
+
+            assert total == total_reader == 16 * 1024 * 1024
+            assert reader_hops <= aiofiles_hops
+            print(f"\nchunk {chunk_size:>8}: aiofiles {aiofiles_time:.4f}s "
+                  f"({aiofiles_hops} hops), reader {reader_time:.4f}s "
+                  f"({reader_hops} hops)")
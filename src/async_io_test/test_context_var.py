@@ -7,17 +7,19 @@ import pytest
 
 
 class TestContextVar:
-    list_message: list[str] = []
+    list_message: list[str]
     context_var_delay = contextvars.ContextVar("delay", default=1)
     const_text: str = "msg"
 
+    def setup_method(self):
+        self.list_message = []
+
     async def coro_print(self):
         await asyncio.sleep(self.context_var_delay.get())
         self.list_message.append(f"{self.const_text}_{self.context_var_delay.get()}")
 
     @pytest.mark.asyncio
     async def test_context_var_basic(self):
-        self.list_message.clear()
         self.list_message.append("start")
         list_task = [asyncio.create_task(self.coro_print(), name="first")]
         await asyncio.sleep(0)
@@ -36,7 +36,10 @@ class TestRun:
 
 
 class TestCoroutineAndTasks:
-    list_message: list[str] = []
+    list_message: list[str]
+
+    def setup_method(self):
+        self.list_message = []
 
     async def coro_hello(self, delay_sec: int, message: str,
                          ):
@@ -51,7 +54,6 @@ class TestCoroutineAndTasks:
     @pytest.mark.asyncio
     async def test_coroutines(self):
         # корутины выполняться последовательно
-        self.list_message.clear()
         self.list_message.append("start")
         time_start = datetime.now()
         await self.coro_hello(1, "hello")
@@ -63,7 +65,6 @@ class TestCoroutineAndTasks:
 
     @pytest.mark.asyncio
     async def test_tasks(self):
-        self.list_message.clear()
         self.list_message.append("start")
         task1 = asyncio.create_task(self.coro_hello(1, "hello"))
         task2 = asyncio.create_task(self.coro_hello(2, "world"))
@@ -78,7 +79,6 @@ class TestCoroutineAndTasks:
 
     @pytest.mark.asyncio
     async def test_gather_and_cancel_task(self):
-        self.list_message.clear()
         self.list_message.append("start")
         res = await asyncio.gather(self.coro_hello(2, "hello"),
                                    self.coro_chancell(1),
@@ -91,7 +91,6 @@ class TestCoroutineAndTasks:
 
     @pytest.mark.asyncio
     async def test_gather_and_cancel_task_wichout_return_exception(self):
-        self.list_message.clear()
         self.list_message.append("start")
         try:
             res = await asyncio.gather(self.coro_hello(2, "hello"),
@@ -110,7 +109,6 @@ class TestCoroutineAndTasks:
             aw.cancel()
             list_message.append("cancel")
 
-        self.list_message.clear()
         self.list_message.append("start")
         real_task = asyncio.create_task(self.coro_hello(2, "hello"))
         shield = asyncio.shield(real_task)
@@ -123,7 +121,6 @@ class TestCoroutineAndTasks:
 
     @pytest.mark.asyncio
     async def test_timeout_basic(self):
-        self.list_message.clear()
         self.list_message.append("start")
         delay_int_or_float_sec = 2.5
         task = self.coro_hello(5, "hello")
@@ -138,7 +135,6 @@ class TestCoroutineAndTasks:
     @pytest.mark.py311
     @pytest.mark.asyncio
     async def test_timeout_reshedule(self):
-        self.list_message.clear()
         self.list_message.append("start")
         task = self.coro_hello(5, "hello")
         try:
@@ -155,7 +151,6 @@ class TestCoroutineAndTasks:
 
     @pytest.mark.asyncio
     async def test_wait_for(self):
-        self.list_message.clear()
         self.list_message.append("start")
         delay_int_or_float_sec = 2.5
         task = self.coro_hello(5, "hello")
@@ -168,7 +163,10 @@ class TestCoroutineAndTasks:
 
 
 class TestToTread:
-    list_message: list[str] = []
+    list_message: list[str]
+
+    def setup_method(self):
+        self.list_message = []
 
     def func_blocking_io(self, delay: int, text_data: str):
         sleep(delay)
@@ -181,7 +179,6 @@ class TestToTread:
 
     @pytest.mark.asyncio
     async def test_run_in_thread(self):
-        self.list_message.clear()
         self.list_message.append("start")
         await asyncio.gather(
             asyncio.to_thread(self.func_blocking_io, delay=4,
@@ -193,7 +190,10 @@ class TestToTread:
 
 
 class TestTask:
-    list_message: list[str] = []
+    list_message: list[str]
+
+    def setup_method(self):
+        self.list_message = []
 
     async def coro_test(self, delay: int, msg: str,
                         ret_msg: str | None = None) -> str:
@@ -213,7 +213,6 @@ class TestTask:
 
     @pytest.mark.asyncio
     async def test_task_done(self):
-        self.list_message.clear()
         self.list_message.append("start")
         task_demo = asyncio.create_task(self.coro_test(1, "hello", "retry"),
                                         name="task demo")
@@ -229,7 +228,6 @@ class TestTask:
 
     @pytest.mark.asyncio
     async def test_task_cancel(self):
-        self.list_message.clear()
         self.list_message.append("start")
         task_demo = asyncio.create_task(self.coro_test(2,"hello", "retry"),
                                         name="task demo")
@@ -259,7 +257,6 @@ class TestTask:
                 list_message.append("coro_except")
             list_message.append("coro_after_except")
 
-        self.list_message.clear()
         self.list_message.append("start")
         task_demo = asyncio.create_task(coro_uncancelled(self.list_message),
                                         name="task demo")
@@ -0,0 +1,160 @@
+import asyncio
+from time import sleep
+
+import aiofiles
+import pytest
+from instrumented_executor import (ExecutorPools,
+                                   InstrumentedThreadPoolExecutor,
+                                   callable_name)
+
+
+def blocking_io():
+    with open('/dev/urandom', 'rb') as f:
+        return f.read(100)
+
+
+def blocking_sleep(delay: float):
+    sleep(delay)
+    return delay
+
+
+class TestInstrumentedExecutor:
+
+    def test_callable_name(self):
+        import contextvars
+        import functools
+
+        ctx = contextvars.copy_context()
+        wrapped = functools.partial(ctx.run, blocking_sleep, 1)
+        assert callable_name(wrapped) == "blocking_sleep"
+        assert callable_name(functools.partial(blocking_io)) == "blocking_io"
+
+    @pytest.mark.asyncio
+    async def test_install_as_default(self):
+        pools = ExecutorPools({"default": 2})
+        pools.install()
+        loop = asyncio.get_running_loop()
+        try:
+            # оба способа из test_run_in_thread и blocking_io
+            # идут через установленный пул
+            await asyncio.to_thread(blocking_sleep, 0.01)
+            result = await loop.run_in_executor(None, blocking_io)
+            assert len(result) == 100
+        finally:
+            pools.shutdown()
+
+        stats = pools.stats()["default"]
+        assert stats["completed"] == 2
+        assert stats["queue_depth"] == 0
+        assert stats["active_workers"] == 0
+        assert stats["per_callable"]["blocking_sleep"]["count"] == 1
+        assert stats["per_callable"]["blocking_io"]["count"] == 1
+
+    @pytest.mark.asyncio
+    async def test_queue_depth_and_wait_time(self):
+        executor = InstrumentedThreadPoolExecutor(1)
+        loop = asyncio.get_running_loop()
+        try:
+            futures = [loop.run_in_executor(executor, blocking_sleep, 0.1)
+                       for _ in range(3)]
+            await asyncio.sleep(0.05)
+            assert executor.active == 1
+            assert executor.queued == 2
+            await asyncio.gather(*futures)
+        finally:
+            executor.shutdown()
+
+        # третий вызов ждал, пока отработают два предыдущих
+        assert executor.wait_time.max >= 0.19
+        assert executor.run_time.min >= 0.1
+
+    def test_queue_depth_after_cancel_and_shutdown(self):
+        executor = InstrumentedThreadPoolExecutor(1)
+        futures = [executor.submit(blocking_sleep, 0.1) for _ in range(4)]
+        sleep(0.02)
+        executor.shutdown(cancel_futures=True)
+        assert sum(f.cancelled() for f in futures) == 3
+        with pytest.raises(RuntimeError):
+            executor.submit(blocking_sleep, 0)
+        stats = executor.stats()
+        assert stats["queue_depth"] == 0
+        assert stats["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_named_pools_do_not_starve(self):
+        pools = ExecutorPools({"default": 1, "file_io": 1, "dns": 1})
+        try:
+            slow = [asyncio.create_task(pools.run("file_io", blocking_sleep, 0.5))
+                    for _ in range(3)]
+            await asyncio.sleep(0)
+            loop = asyncio.get_running_loop()
+            time_start = loop.time()
+            await pools.run("dns", blocking_sleep, 0.01)
+            assert loop.time() - time_start < 0.3
+            assert pools["file_io"].queued == 2
+            await asyncio.gather(*slow)
+        finally:
+            pools.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_autoscale(self):
+        executor = InstrumentedThreadPoolExecutor(
+            1, autoscale_max_workers=4, target_wait=0.01)
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*[
+                loop.run_in_executor(executor, blocking_sleep, 0.05)
+                for _ in range(8)])
+        finally:
+            executor.shutdown()
+        assert 1 < executor.max_workers <= 4
+        assert executor.threads > 1
+
+    @pytest.mark.asyncio
+    async def test_autoscale_shrink(self):
+        executor = InstrumentedThreadPoolExecutor(
+            1, autoscale_max_workers=4, target_wait=0.01, shrink_after=5)
+        loop = asyncio.get_running_loop()
+        try:
+            await asyncio.gather(*[
+                loop.run_in_executor(executor, blocking_sleep, 0.05)
+                for _ in range(8)])
+            grown = executor.threads
+            assert grown > 1
+            # ожидание упало ниже target_wait - пул возвращается к 1 потоку
+            for _ in range(5 * 4):
+                await loop.run_in_executor(executor, blocking_sleep, 0)
+            await asyncio.sleep(0.05)
+            assert executor.max_workers == 1
+            assert executor.threads == 1
+            assert await loop.run_in_executor(
+                executor, blocking_sleep, 0.01) == 0.01
+        finally:
+            executor.shutdown()
+
+    def test_resize_down(self):
+        executor = InstrumentedThreadPoolExecutor(4)
+        try:
+            list(executor.map(blocking_sleep, [0.05] * 4))
+            assert executor.threads == 4
+            executor.resize(2)
+            sleep(0.05)
+            assert executor.threads == 2
+            assert list(executor.map(blocking_sleep, [0.01] * 4)) == [0.01] * 4
+            assert executor.threads == 2
+        finally:
+            executor.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_aiofiles_in_file_pool(self, tmp_path):
+        temp_file = tmp_path / "data.bin"
+        temp_file.write_bytes(b"x" * 1024)
+        pools = ExecutorPools({"default": 1, "file_io": 2})
+        try:
+            async with aiofiles.open(temp_file, 'rb',
+                                     executor=pools["file_io"]) as f:
+                assert len(await f.read()) == 1024
+        finally:
+            pools.shutdown()
+        assert pools["file_io"].completed >= 2
+        assert pools["default"].completed == 0
@@ -19,7 +19,10 @@ class TestLock:
 
 
 class TestEvent:
-    list_message: list[str] = []
+    list_message: list[str]
+
+    def setup_method(self):
+        self.list_message = []
 
     async def coro_wait(self, delay: int, msg: str, event: asyncio.Event):
         await event.wait()
@@ -28,7 +31,6 @@ class TestEvent:
 
     @pytest.mark.asyncio
     async def test_event_basic(self):
-        self.list_message.clear()
         event = asyncio.Event()
         task1 = asyncio.create_task(self.coro_wait(1, "first", event))
         task2 = asyncio.create_task(self.coro_wait(2, "two", event))
@@ -41,10 +43,13 @@ class TestEvent:
 
 
 class TestSemaphore:
-    list_message: list[str] = []
+    list_message: list[str]
     sem: asyncio.Semaphore = None
     date_time_start: datetime.datetime = None
 
+    def setup_method(self):
+        self.list_message = []
+
     async def coro_acq_sem(self):
         async with self.sem:
             await asyncio.sleep(1)
@@ -53,7 +58,6 @@ class TestSemaphore:
 
     @pytest.mark.asyncio
     async def test_semaphore_basic(self):
-        self.list_message.clear()
         task_1 = asyncio.create_task(self.coro_acq_sem())
         task_2 = asyncio.create_task(self.coro_acq_sem())
         task_3 = asyncio.create_task(self.coro_acq_sem())
@@ -70,10 +74,13 @@ class TestSemaphore:
 
 
 class TestBarrier:
-    list_message: list[str] = []
+    list_message: list[str]
     date_time_start: datetime.datetime = None
     barrier: asyncio.Barrier = None
 
+    def setup_method(self):
+        self.list_message = []
+
     async def coro_wait(self):
         await self.barrier.wait()
         sec_from_start = int((datetime.datetime.now() - self.date_time_start).total_seconds())
@@ -84,7 +91,6 @@ class TestBarrier:
         """ тут сразу несколько моментов:
             1. Если мы создаем несколько Task, то при первом await они все запускаются на выполнение, без всякого gather
             2. После того как 3 такси встали у барьера - счетчик сбрасывается, поэтому четвертая задача так и не будет выполнена"""
-        self.list_message.clear()
         self.barrier = asyncio.Barrier(3)
         self.list_message.append("start")
         self.date_time_start = datetime.datetime.now()
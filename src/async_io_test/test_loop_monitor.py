@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+from loop_monitor import LoopMonitor
+
+
+def blocking_handler(delay: float):
+    # типичная ошибка: синхронный вызов внутри корутины
+    time.sleep(delay)
+
+
+class TestLoopMonitor:
+    list_message: list[str]
+
+    def setup_method(self):
+        self.list_message = []
+
+    async def coro_hello(self, delay_sec: float, message: str):
+        await asyncio.sleep(delay_sec)
+        self.list_message.append(message)
+
+    @pytest.mark.asyncio
+    async def test_lag_sampling(self):
+        with LoopMonitor(interval=0.01) as monitor:
+            await asyncio.sleep(0.2)
+        assert monitor.lag.count >= 10
+        assert monitor.lag.percentile(50) < 0.05
+        assert not monitor.slow_events
+
+    @pytest.mark.asyncio
+    async def test_slow_callback_with_stack(self):
+        async def slow_coro():
+            await asyncio.sleep(0.05)
+            blocking_handler(0.3)
+
+        with LoopMonitor(interval=0.02, slow_threshold=0.1) as monitor:
+            await asyncio.create_task(slow_coro(), name="slow task")
+            await asyncio.sleep(0.05)
+
+        assert len(monitor.slow_events) == 1
+        event = monitor.slow_events[0]
+        assert event.duration >= 0.25
+        assert event.task_name == "slow task"
+        assert any("blocking_handler" in line for line in event.stack)
+        assert monitor.lag.max >= 0.25
+
+    @pytest.mark.asyncio
+    async def test_task_counters(self):
+        with LoopMonitor(count_tasks=True, sample_every=1) as monitor:
+            await asyncio.gather(*[
+                asyncio.create_task(self.coro_hello(0.01, f"msg_{i}"))
+                for i in range(5)])
+        assert len(self.list_message) == 5
+        snapshot = monitor.snapshot()
+        assert snapshot["tasks_created"] == 5
+        assert snapshot["tasks_done"] == 5
+        assert snapshot["task_duration"]["count"] == 5
+        # после stop фабрика задач восстановлена
+        assert asyncio.get_running_loop().get_task_factory() is None
+
+    @pytest.mark.asyncio
+    async def test_overhead(self):
+        async def handler(work: int):
+            await asyncio.sleep(0)
+            return sum(range(work))
+
+        async def run(n: int, work: int) -> float:
+            time_start = time.perf_counter()
+            for _ in range(n // 1000):
+                await asyncio.gather(*[asyncio.create_task(handler(work))
+                                       for _ in range(1000)])
+            return time.perf_counter() - time_start
+
+        n = 10_000
+        overhead: dict[tuple[int, bool], float] = {}
+        # work=0 - худший случай, пустые задачи; work=1000 - порядка 20 мкс
+        for work in (0, 1000):
+            for count_tasks in (True, False):
+                # прогоны чередуются, чтобы внешняя нагрузка (например,
+                # pytest -n) задевала обе стороны; берется лучший из пяти
+                list_baseline: list[float] = []
+                list_monitored: list[float] = []
+                for _ in range(5):
+                    list_baseline.append(await run(n, work))
+                    with LoopMonitor(count_tasks=count_tasks):
+                        list_monitored.append(await run(n, work))
+                baseline, monitored = min(list_baseline), min(list_monitored)
+                overhead[work, count_tasks] = monitored / baseline - 1
+                print(f"\n{n} tasks, work {work}, count_tasks {count_tasks}: "
+                      f"baseline {baseline:.3f}s, monitored {monitored:.3f}s "
+                      f"({overhead[work, count_tasks] * 100:+.1f}%)")
+
+        # Цель - меньше 1% для настройки по умолчанию (count_tasks=False)
+        # на задачах с работой. Замеры на этой машине (одно ядро): от -11%
+        # до +4% для обоих work при чередовании прогонов и до +66% без него
+        # под pytest -n 4, то есть разброс между прогонами на порядок
+        # больше самой накладки - строгие 1% тест проверить не может.
+        # Проверяем с запасом на шум: накладка не видна на фоне разброса.
+        assert overhead[1000, False] < 0.25
+        assert overhead[0, False] < 0.5
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from micro_batcher import MicroBatcher
+
+
+class TestMicroBatcher:
+    list_batch: list[list[int]]
+
+    def setup_method(self):
+        self.list_batch = []
+
+    async def bulk_double(self, items: list[int]) -> list[int]:
+        # например, один bulk insert в БД вместо множества мелких
+        self.list_batch.append(items)
+        await asyncio.sleep(0.01)
+        return [item * 2 for item in items]
+
+    @pytest.mark.asyncio
+    async def test_flush_by_size_and_timer(self):
+        batcher = MicroBatcher(self.bulk_double, max_size=4, max_delay=0.05)
+        loop = asyncio.get_running_loop()
+        time_start = loop.time()
+        res = await asyncio.gather(*[batcher.submit(i) for i in range(10)])
+
+        assert res == [i * 2 for i in range(10)]
+        # две полные пачки сразу, остаток - по таймеру
+        assert self.list_batch == [[0, 1, 2, 3], [4, 5, 6, 7], [8, 9]]
+        assert loop.time() - time_start >= 0.05
+        assert batcher.batch_size.count == 3
+        assert batcher.batch_size.max == 4
+        assert batcher.latency.count == 10
+
+    @pytest.mark.asyncio
+    async def test_cancel_caller_before_flush(self):
+        batcher = MicroBatcher(self.bulk_double, max_size=10, max_delay=0.05)
+        tasks = [asyncio.create_task(batcher.submit(i)) for i in range(3)]
+        await asyncio.sleep(0)
+        tasks[1].cancel()
+        await asyncio.wait(tasks)
+
+        assert tasks[1].cancelled()
+        assert tasks[0].result() == 0
+        assert tasks[2].result() == 4
+        assert self.list_batch == [[0, 2]]
+
+    @pytest.mark.asyncio
+    async def test_cancel_caller_after_flush(self):
+        batcher = MicroBatcher(self.bulk_double, max_size=2)
+        first = asyncio.create_task(batcher.submit(1))
+        second = asyncio.create_task(batcher.submit(2))
+        await asyncio.sleep(0)
+        # пачка уже ушла в bulk_double
+        first.cancel()
+        assert await second == 4
+        assert first.cancelled()
+        assert self.list_batch == [[1, 2]]
+
+    @pytest.mark.asyncio
+    async def test_batch_error(self):
+        async def broken(items: list[int]) -> list[int]:
+            raise RuntimeError("db is down")
+
+        batcher = MicroBatcher(broken, max_size=2)
+        res = await asyncio.gather(batcher.submit(1), batcher.submit(2),
+                                   return_exceptions=True)
+        assert all(isinstance(exc, RuntimeError) for exc in res)
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending(self):
+        batcher = MicroBatcher(self.bulk_double, max_size=10, max_delay=10)
+        task = asyncio.create_task(batcher.submit(21))
+        await asyncio.sleep(0)
+        await batcher.close()
+        assert await task == 42
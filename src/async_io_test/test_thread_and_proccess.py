@@ -4,7 +4,10 @@ import concurrent.futures
 
 class TestRunInThreadAndPorcces:
     # https://docs.python.org/3/library/asyncio-eventloop.html
-    list_message: list[str] = []
+    list_message: list[str]
+
+    def setup_method(self):
+        self.list_message = []
 
     def blocking_io(self):
         # File operations (such as logging) can block the
@@ -19,7 +22,6 @@ class TestRunInThreadAndPorcces:
         return sum(i * i for i in range(10 ** 7))
 
     async def main(self):
-        self.list_message.clear()
         loop = asyncio.get_running_loop()
         # Options:
         # 1. Run in the default loop's executor:
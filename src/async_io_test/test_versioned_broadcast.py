@@ -0,0 +1,125 @@
+import asyncio
+import time
+
+import pytest
+from versioned_broadcast import VersionedBroadcast
+
+
+class TestVersionedBroadcast:
+    list_message: list[str]
+
+    def setup_method(self):
+        self.list_message = []
+
+    async def coro_wait(self, broadcast: VersionedBroadcast, after: int,
+                        msg: str):
+        version, value = await broadcast.wait(after)
+        self.list_message.append(f"{msg}_{version}_{value}")
+
+    @pytest.mark.asyncio
+    async def test_broadcast_basic(self):
+        broadcast = VersionedBroadcast("v0")
+        task1 = asyncio.create_task(self.coro_wait(broadcast, 0, "first"))
+        task2 = asyncio.create_task(self.coro_wait(broadcast, 0, "two"))
+        await asyncio.sleep(0)
+        self.list_message.append("start")
+        broadcast.publish("config")
+        await asyncio.gather(task1, task2)
+        self.list_message.append("stop")
+        assert "start first_1_config two_1_config stop".split() \
+            == self.list_message
+
+    @pytest.mark.asyncio
+    async def test_update_not_missed(self):
+        # в отличие от Event, обновление между двумя wait не теряется
+        broadcast = VersionedBroadcast()
+        broadcast.publish("a")
+        broadcast.publish("b")
+        assert await broadcast.wait(0) == (2, "b")
+        assert await broadcast.wait(1) == (2, "b")
+
+        waiter = asyncio.create_task(broadcast.wait(3))
+        broadcast.publish("c")
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        broadcast.publish("d")
+        assert await waiter == (4, "d")
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiters_removed(self):
+        broadcast = VersionedBroadcast()
+        tasks = [asyncio.create_task(broadcast.wait(0)) for _ in range(1000)]
+        await asyncio.sleep(0)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        # без публикаций список ожидающих не растет
+        assert len(broadcast._waiters) == 0
+
+    @pytest.mark.asyncio
+    async def test_coalesce(self):
+        broadcast = VersionedBroadcast(coalesce=0.05)
+        task = asyncio.create_task(self.coro_wait(broadcast, 0, "waiter"))
+        await asyncio.sleep(0)
+        for value in ("a", "b", "c"):
+            broadcast.publish(value)
+        await task
+        # три обновления подряд - одна версия и одно пробуждение
+        assert ["waiter_1_c"] == self.list_message
+        assert broadcast.version == 1
+
+    @pytest.mark.asyncio
+    async def test_jitter(self):
+        broadcast = VersionedBroadcast(jitter=0.1)
+        loop = asyncio.get_running_loop()
+        list_wakeup: list[float] = []
+
+        async def waiter():
+            await broadcast.wait(0)
+            list_wakeup.append(loop.time())
+
+        tasks = [asyncio.create_task(waiter()) for _ in range(1000)]
+        await asyncio.sleep(0)
+        time_publish = loop.time()
+        broadcast.publish("config")
+        await asyncio.gather(*tasks)
+
+        spread = max(list_wakeup) - min(list_wakeup)
+        assert 0.05 < spread < 0.2
+        assert max(list_wakeup) - time_publish < 0.2
+        assert broadcast.notified == 1000
+
+    @pytest.mark.asyncio
+    async def test_benchmark_10k_waiters(self):
+        n = 10_000
+        loop = asyncio.get_running_loop()
+
+        async def run(make_waiter, publish) -> tuple[float, float, float]:
+            list_latency: list[float] = []
+            time_publish = 0.0
+
+            async def waiter():
+                await make_waiter()
+                list_latency.append(loop.time() - time_publish)
+
+            tasks = [asyncio.create_task(waiter()) for _ in range(n)]
+            await asyncio.sleep(0)
+            cpu_start = time.process_time()
+            time_publish = loop.time()
+            publish()
+            await asyncio.gather(*tasks)
+            cpu = time.process_time() - cpu_start
+            return (sum(list_latency) / n, max(list_latency), cpu)
+
+        event = asyncio.Event()
+        results = {"asyncio.Event": await run(event.wait, event.set)}
+        for name, broadcast in (
+                ("VersionedBroadcast", VersionedBroadcast()),
+                ("VersionedBroadcast jitter 50ms",
+                 VersionedBroadcast(jitter=0.05))):
+            results[name] = await run(lambda: broadcast.wait(0),
+                                      lambda: broadcast.publish("config"))
+
+        for name, (mean, worst, cpu) in results.items():
+            print(f"\n{name}: {n} waiters, latency mean {mean * 1000:.2f}ms "
+                  f"max {worst * 1000:.2f}ms, cpu {cpu * 1000:.1f}ms")
@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+from weighted_semaphore import PrioritySemaphore, WeightedSemaphore
+
+
+class TestWeightedSemaphore:
+    list_message: list[str]
+
+    def setup_method(self):
+        self.list_message = []
+
+    async def coro_acq_sem(self, sem: WeightedSemaphore, weight: int,
+                           msg: str, delay: float = 0.01):
+        async with sem.weighted(weight):
+            self.list_message.append(msg)
+            await asyncio.sleep(delay)
+
+    @pytest.mark.asyncio
+    async def test_weighted_basic(self):
+        sem = WeightedSemaphore(10)
+        await sem.acquire(6)
+        assert sem.locked(5)
+        assert not sem.locked(4)
+        assert sem.utilization == 0.6
+        sem.release(6)
+        assert sem.in_use == 0
+
+        with pytest.raises(ValueError):
+            await sem.acquire(11)
+
+    @pytest.mark.asyncio
+    async def test_big_request_not_starved(self):
+        # большой запрос стоит в очереди первым - мелкие его не обгоняют
+        sem = WeightedSemaphore(10)
+        await sem.acquire(4)
+        big = asyncio.create_task(self.coro_acq_sem(sem, 10, "big"))
+        await asyncio.sleep(0)
+        small = [asyncio.create_task(self.coro_acq_sem(sem, 1, f"small_{i}"))
+                 for i in range(3)]
+        await asyncio.sleep(0.05)
+        assert self.list_message == []
+        sem.release(4)
+        await asyncio.gather(big, *small)
+        assert "big small_0 small_1 small_2".split() == self.list_message
+        assert sem.wait_time.count == 5
+        assert sem.wait_time.max >= 0.05
+
+    @pytest.mark.asyncio
+    async def test_cancel_waiter(self):
+        sem = WeightedSemaphore(10)
+        await sem.acquire(8)
+        big = asyncio.create_task(self.coro_acq_sem(sem, 5, "big"))
+        small = asyncio.create_task(self.coro_acq_sem(sem, 2, "small"))
+        await asyncio.sleep(0)
+        # отмена головы очереди пропускает следующего
+        big.cancel()
+        await asyncio.gather(big, return_exceptions=True)
+        await asyncio.gather(small)
+        assert big.cancelled()
+        assert ["small"] == self.list_message
+        sem.release(8)
+        assert sem.in_use == 0
+
+    async def coro_priority(self, sem: PrioritySemaphore, priority: int,
+                            msg: str):
+        async with sem.weighted(2, priority=priority):
+            self.list_message.append(msg)
+            await asyncio.sleep(0)
+
+    @pytest.mark.asyncio
+    async def test_priority(self):
+        sem = PrioritySemaphore(2)
+        await sem.acquire(2)
+        tasks = []
+        for priority, msg in ((5, "low"), (0, "high"), (5, "low_2"), (1, "mid")):
+            tasks.append(asyncio.create_task(self.coro_priority(sem, priority, msg)))
+            await asyncio.sleep(0)
+        sem.release(2)
+        await asyncio.gather(*tasks)
+        assert "high mid low low_2".split() == self.list_message
+
+        # новый приоритетный запрос помещается сразу, хотя перед ним
+        # (до его прихода) стоял большой
+        sem = PrioritySemaphore(10)
+        await sem.acquire(4)
+        big = asyncio.create_task(sem.acquire(10, priority=5))
+        await asyncio.sleep(0)
+        small = asyncio.create_task(sem.acquire(2, priority=0))
+        await asyncio.sleep(0.01)
+        assert small.done() and not big.done()
+        assert sem.in_use == 6
+        big.cancel()
+        await asyncio.gather(big, return_exceptions=True)
+
+    @pytest.mark.asyncio
+    async def test_benchmark_vs_semaphore(self):
+        n = 20_000
+
+        async def worker(sem):
+            async with sem:
+                await asyncio.sleep(0)
+
+        for name, sem in (("asyncio.Semaphore", asyncio.Semaphore(10)),
+                          ("WeightedSemaphore", WeightedSemaphore(10)),
+                          ("PrioritySemaphore", PrioritySemaphore(10))):
+            time_start = time.perf_counter()
+            await asyncio.gather(*[worker(sem) for _ in range(n)])
+            print(f"\n{name}: {n} tasks, capacity 10: "
+                  f"{time.perf_counter() - time_start:.3f}s")
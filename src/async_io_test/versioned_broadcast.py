@@ -0,0 +1,74 @@
+import asyncio
+import random
+from typing import Any
+
+
+class VersionedBroadcast:
+    """Broadcast of config / cache-invalidation changes to many waiters.
+
+    Unlike asyncio.Event, waiters ask for "a version newer than N", so an
+    update published between two waits is never missed and nothing has to
+    be cleared. With `jitter` the wakeups are shuffled and spread over that
+    many seconds in small slices instead of waking every waiter at once.
+    With `coalesce` a publish only schedules a flush after that many
+    seconds; rapid successive updates collapse into one new version.
+    """
+
+    def __init__(self, value: Any = None, *, jitter: float = 0.0,
+                 coalesce: float = 0.0, slice_interval: float = 0.001):
+        self.version = 0
+        self.value = value
+        self.jitter = jitter
+        self.coalesce = coalesce
+        self.slice_interval = slice_interval
+        self.notified = 0
+        self._waiters: list[tuple[int, asyncio.Future]] = []
+        self._pending_value: Any = None
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    async def wait(self, after_version: int) -> tuple[int, Any]:
+        if self.version <= after_version:
+            fut = asyncio.get_running_loop().create_future()
+            waiter = (after_version, fut)
+            self._waiters.append(waiter)
+            try:
+                await fut
+            except asyncio.CancelledError:
+                # отмененное ожидание не должно копиться до следующей версии
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+        return self.version, self.value
+
+    def publish(self, value: Any):
+        self._pending_value = value
+        if not self.coalesce:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.coalesce, self._flush)
+
+    def _flush(self):
+        self._flush_handle = None
+        self.version += 1
+        self.value = self._pending_value
+        ready = [fut for after, fut in self._waiters if after < self.version]
+        self._waiters = [(after, fut) for after, fut in self._waiters
+                         if after >= self.version and not fut.done()]
+        if not self.jitter or not ready:
+            self._wake(ready)
+            return
+
+        random.shuffle(ready)
+        slices = max(1, int(self.jitter / self.slice_interval))
+        size = -(-len(ready) // slices)
+        loop = asyncio.get_running_loop()
+        for i in range(0, len(ready), size):
+            loop.call_later(i // size * self.slice_interval,
+                            self._wake, ready[i:i + size])
+
+    def _wake(self, futures: list[asyncio.Future]):
+        for fut in futures:
+            if not fut.done():
+                fut.set_result(None)
+                self.notified += 1
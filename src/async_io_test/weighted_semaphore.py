@@ -0,0 +1,159 @@
+import asyncio
+import heapq
+import itertools
+from collections import deque
+
+from metrics import Histogram
+
+
+class _Acquired:
+    __slots__ = ("sem", "weight", "kwargs")
+
+    def __init__(self, sem, weight: int, **kwargs):
+        self.sem = sem
+        self.weight = weight
+        self.kwargs = kwargs
+
+    async def __aenter__(self):
+        await self.sem.acquire(self.weight, **self.kwargs)
+
+    async def __aexit__(self, *exc_info):
+        self.sem.release(self.weight)
+
+
+class WeightedSemaphore:
+    """Semaphore limited by total cost (bytes in flight, connections...)
+    instead of a number of holders.
+
+    Waiters are woken strictly in order: a big request at the head of the
+    queue is not overtaken by small ones behind it, so it can't be starved.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be greater than 0")
+        self.capacity = capacity
+        self.in_use = 0
+        self.wait_time = Histogram()
+        self._waiters = deque()
+
+    @property
+    def utilization(self) -> float:
+        return self.in_use / self.capacity
+
+    def locked(self, weight: int = 1) -> bool:
+        return self._has_waiters() or self.in_use + weight > self.capacity
+
+    def weighted(self, weight: int) -> _Acquired:
+        # async with sem.weighted(len(body)): ...
+        return _Acquired(self, weight)
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    async def acquire(self, weight: int = 1, **kwargs) -> bool:
+        if not 0 < weight <= self.capacity:
+            raise ValueError(f"weight must be in 1..{self.capacity}")
+        if not self.locked(weight):
+            self.in_use += weight
+            self.wait_time.record(0.0)
+            return True
+
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        entry = self._push(fut, weight, **kwargs)
+        if self._peek() is entry:
+            # в PrioritySemaphore новый ожидающий может встать перед тем,
+            # кто не помещается: его нужно пропустить сразу, не дожидаясь
+            # чужого release()
+            self._wake_up()
+        started = loop.time()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # разрешение уже выдано, но задачу отменили - возвращаем его
+                self.release(weight)
+            else:
+                self._remove(entry)
+                self._wake_up()
+            raise
+        self.wait_time.record(loop.time() - started)
+        return True
+
+    def release(self, weight: int = 1):
+        if weight > self.in_use:
+            raise ValueError("WeightedSemaphore released too many times")
+        self.in_use -= weight
+        self._wake_up()
+
+    def _wake_up(self):
+        while (entry := self._peek()) is not None:
+            fut, weight = entry[-2], entry[-1]
+            if self.in_use + weight > self.capacity:
+                break
+            self._pop()
+            self.in_use += weight
+            fut.set_result(True)
+
+    # очередь ожидания: FIFO
+    def _push(self, fut: asyncio.Future, weight: int):
+        entry = (fut, weight)
+        self._waiters.append(entry)
+        return entry
+
+    def _peek(self):
+        # Task.cancel() отменяет future сразу, а из очереди задача
+        # удаляет себя позже, когда возобновится
+        while self._waiters and self._waiters[0][0].cancelled():
+            self._waiters.popleft()
+        return self._waiters[0] if self._waiters else None
+
+    def _pop(self):
+        self._waiters.popleft()
+
+    def _remove(self, entry):
+        try:
+            self._waiters.remove(entry)
+        except ValueError:
+            pass
+
+    def _has_waiters(self) -> bool:
+        return self._peek() is not None
+
+
+class PrioritySemaphore(WeightedSemaphore):
+    """WeightedSemaphore whose wait queue is a heap: a lower `priority`
+    value is served first, FIFO among equal priorities."""
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self._waiters: list = []
+        self._counter = itertools.count()
+
+    def weighted(self, weight: int, priority: int = 0) -> _Acquired:
+        return _Acquired(self, weight, priority=priority)
+
+    async def acquire(self, weight: int = 1, priority: int = 0) -> bool:
+        return await super().acquire(weight, priority=priority)
+
+    def _push(self, fut: asyncio.Future, weight: int, priority: int = 0):
+        entry = (priority, next(self._counter), fut, weight)
+        heapq.heappush(self._waiters, entry)
+        return entry
+
+    def _peek(self):
+        # отмененные ожидающие удаляются из кучи лениво
+        while self._waiters and self._waiters[0][2].cancelled():
+            heapq.heappop(self._waiters)
+        return self._waiters[0] if self._waiters else None
+
+    def _pop(self):
+        heapq.heappop(self._waiters)
+
+    def _remove(self, entry):
+        # future уже отменен, _peek выбросит запись сам
+        pass